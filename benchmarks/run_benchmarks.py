@@ -0,0 +1,257 @@
+"""
+Benchmarks of the developer_data and trends hot paths on synthetic data
+
+    python benchmarks/run_benchmarks.py --size 10k --size 100k
+    python benchmarks/run_benchmarks.py --size 10k --compare benchmarks/results/<earlier run>.json
+
+Every size generates its data with synthetic_data (same seed, same data), indexes it
+like get_data does and times each benchmark --repeat times after one warm-up call.
+The results are written to --output (benchmarks/results/ by default, not tracked
+by git) as one JSON file per run, with the commit and machine they were measured
+on, so runs can be compared.
+
+Captions are mostly told apart by their script. The few with Persian or Urdu letters
+go to langdetect on the first run of a size, the "index_dataset" time of later runs
+looks them up in LANGUAGE_CACHE_PATH.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+from rapidfuzz import fuzz
+
+# The benchmarks directory and the repository root, where the dashboard modules live
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import SIZES, generate_accounts, generate_trends
+
+from developer_cube import cube_dataset
+from developer_data import (
+    FUZZY_WORKERS,
+    THEME_KEYWORDS,
+    filter_data,
+    get_accounts,
+    get_engagement_trend_data,
+    get_post_trend_data,
+    get_theme_distribution,
+    get_theme_distribution_over_time,
+    get_top_keywords,
+)
+from developer_index import index_dataset
+from keyword_matcher import get_theme_matcher
+from trends_data import ALL, TrendsAggregates, build_trends_frame
+from trends_growth import GROWTH_METRICS, KeywordMatrix, top_k_growing
+
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(REPOSITORY, "benchmarks", "results")
+
+# Unmatched posts the fuzzy phase is compared on, the nested loop takes about a
+# millisecond per post
+FUZZY_SAMPLE = int(os.environ.get("BENCHMARK_FUZZY_SAMPLE", 2_000))
+
+
+def measure(function, repeat, warmup=1):
+    """Seconds of each of repeat calls of function, after warmup untimed calls"""
+    for _ in range(warmup):
+        function()
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - started)
+    return _summary(runs)
+
+
+def _summary(runs):
+    return {
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+    }
+
+
+def filter_selections(data):
+    """One selection per filter type, picked the same way for every size"""
+    themes = list(THEME_KEYWORDS)
+    usernames = sorted(account["username"] for account in data)
+    countries = sorted({account["country"] for account in data if account["country"]})
+    return {
+        "themes": {"selected_themes": themes[:2]},
+        "keywords": {"selected_keywords": ["swimming pool", "smart", "garden"]},
+        "accounts": {"selected_accounts": usernames[::max(1, len(usernames) // 20)]},
+        "countries": {"selected_countries": countries[:2]},
+        "date_range": {"date_range": (date(2023, 1, 1), date(2023, 6, 30))},
+        "combined": {
+            "selected_themes": themes[:3],
+            "selected_countries": countries[:3],
+            "date_range": (date(2022, 6, 1), date(2024, 6, 30)),
+        },
+    }
+
+
+def nested_fuzzy_themes(text_blobs, threshold, keywords_per_theme=None):
+    """
+    The fuzzy phase before it was batched, partial_ratio one pair at a time. It
+    scored the first 10 keywords of each theme, None scores all of them.
+    """
+    theme_keywords = {theme: [keyword.lower() for keyword in keywords[:keywords_per_theme]] for theme, keywords in THEME_KEYWORDS.items()}
+    matched = []
+    for text_blob in text_blobs:
+        matched.append({
+            theme for theme, keywords in theme_keywords.items()
+            if any(len(keyword) > 3 and fuzz.partial_ratio(keyword, text_blob) >= threshold for keyword in keywords)
+        })
+    return matched
+
+
+def fuzzy_benchmarks(index, repeat):
+    """
+    The fuzzy phase of get_theme_distribution on the posts no keyword matched exactly,
+    batched on FUZZY_WORKERS threads against the nested loop it replaced. The batched
+    phase scores every keyword, the nested loop scored the first 10 of each theme
+    and is also timed over every keyword.
+    """
+    blobs = [text_blob for text_blob, mask in zip(index.text_blobs, index.theme_masks) if mask == index.others_bit and len(text_blob) > 3]
+    blobs = blobs[:FUZZY_SAMPLE]
+    matcher = get_theme_matcher(THEME_KEYWORDS)
+
+    results = {}
+    for threshold in (60, 80):
+        results[f"fuzzy_phase/{threshold}/batched"] = measure(lambda: matcher.fuzzy_match_masks(blobs, threshold, workers=FUZZY_WORKERS), repeat)
+        results[f"fuzzy_phase/{threshold}/batched_first_theme"] = measure(lambda: matcher.fuzzy_match_masks(blobs, threshold, workers=FUZZY_WORKERS, first_only=True), repeat)
+        results[f"fuzzy_phase/{threshold}/nested_first_10"] = measure(lambda: nested_fuzzy_themes(blobs, threshold, 10), repeat)
+        results[f"fuzzy_phase/{threshold}/nested_every_keyword"] = measure(lambda: nested_fuzzy_themes(blobs, threshold), repeat)
+    return results
+
+
+def developer_benchmarks(data, repeat):
+    results = {}
+
+    # Built once per dataset by get_data, timed once
+    started = time.perf_counter()
+    index = index_dataset(data, THEME_KEYWORDS)
+    cube_dataset(data, index)
+    results["index_dataset"] = _summary([time.perf_counter() - started])
+
+    for name, selection in filter_selections(data).items():
+        results[f"filter_data/{name}"] = measure(lambda: filter_data(data, **selection), repeat)
+
+    results["get_theme_distribution/exact"] = measure(lambda: get_theme_distribution(data, fuzzy=False), repeat)
+    results["get_theme_distribution/fuzzy"] = measure(lambda: get_theme_distribution(data, fuzzy=True), repeat)
+    results.update(fuzzy_benchmarks(index, repeat))
+    results["get_top_keywords"] = measure(lambda: get_top_keywords(data), repeat)
+    results["get_accounts"] = measure(lambda: get_accounts(data), repeat)
+    results["get_post_trend_data"] = measure(lambda: get_post_trend_data(data), repeat)
+    results["get_engagement_trend_data"] = measure(lambda: get_engagement_trend_data(data), repeat)
+    results["get_theme_distribution_over_time"] = measure(lambda: get_theme_distribution_over_time(data), repeat)
+    return results
+
+
+def trends_benchmarks(docs, repeat):
+    results = {}
+    results["trends/build_trends_frame"] = measure(lambda: build_trends_frame(docs), repeat)
+
+    df = build_trends_frame(docs)
+    results["trends/aggregates"] = measure(lambda: TrendsAggregates(df), repeat)
+
+    aggregates = TrendsAggregates(df)
+    selections = [(theme, country) for theme in [ALL] + aggregates.themes for country in [ALL] + aggregates.countries]
+    results["trends/view_all_selections"] = measure(lambda: [aggregates.view(*selection) for selection in selections], repeat)
+
+    # Growth of every keyword of the widest selection, uncached
+    matrix = KeywordMatrix(aggregates.keyword_dates[(ALL, ALL)])
+    for metric in GROWTH_METRICS:
+        results[f"trends/top_k_growing/{metric}"] = measure(lambda: top_k_growing(matrix, 3, metric), repeat)
+    return results
+
+
+def run_size(size, seed, repeat):
+    n_posts = SIZES[size]
+    print(f"Generating {size}: {n_posts} posts and trend entries")
+    started = time.perf_counter()
+    data = generate_accounts(n_posts, seed)
+    docs = generate_trends(n_posts, seed)
+    generated = time.perf_counter() - started
+
+    benchmarks = developer_benchmarks(data, repeat)
+    benchmarks.update(trends_benchmarks(docs, repeat))
+    for name, result in benchmarks.items():
+        print(f"  {name:<40} median {result['median'] * 1000:10.1f}ms")
+
+    return {
+        "posts": n_posts,
+        "accounts": len(data),
+        "trend_entries": sum(len(doc["timeline"]) for doc in docs),
+        "generate_seconds": generated,
+        "benchmarks": benchmarks,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPOSITORY, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    """Print the median of every benchmark next to the one of an earlier run"""
+    for size, size_results in results["sizes"].items():
+        previous_size = previous.get("sizes", {}).get(size)
+        if previous_size is None:
+            print(f"{size}: not in the earlier run")
+            continue
+        print(f"{size}: median now / before ({previous.get('commit') or 'unknown commit'})")
+        for name, result in size_results["benchmarks"].items():
+            before = previous_size["benchmarks"].get(name)
+            if before is None:
+                print(f"  {name:<40} {result['median'] * 1000:10.1f}ms          new")
+                continue
+            ratio = result["median"] / before["median"] if before["median"] else float("inf")
+            print(f"  {name:<40} {result['median'] * 1000:10.1f}ms {before['median'] * 1000:10.1f}ms  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard hot paths on synthetic data")
+    parser.add_argument("--size", action="append", choices=list(SIZES), help="Dataset size, can be repeated (default 10k)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per benchmark")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Directory of the JSON results")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "sizes": {size: run_size(size, args.seed, args.repeat) for size in args.size or ["10k"]},
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"benchmarks-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
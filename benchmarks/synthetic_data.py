@@ -0,0 +1,176 @@
+"""
+Deterministic synthetic data for the benchmarks
+
+Accounts and posts have the shape of the realestate-developers collection and
+trend documents the shape of the google-trends collection. The same seed and size
+always give the same data: Faker and numpy are both seeded, Faker only fills pools of
+names and sentences and numpy picks from them, which also keeps 1M posts fast to build.
+"""
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+from faker import Faker
+
+# The dashboard modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from developer_data import THEME_KEYWORDS
+from language_keywords import ARABIC_THEME_KEYWORDS
+
+
+SIZES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+# Country of the account, share of accounts, share of their posts written in Arabic
+COUNTRIES = [
+    ("United Arab Emirates", 0.35, 0.3),
+    ("Saudi Arabia", 0.2, 0.5),
+    ("Egypt", 0.15, 0.6),
+    ("United Kingdom", 0.12, 0.0),
+    ("United States", 0.1, 0.0),
+    ("", 0.08, 0.1),
+]
+
+# Google Trends geo codes of the trend timelines
+TREND_GEOS = ["AE", "SA", "EG", "GB"]
+
+FIRST_DAY = date(2022, 1, 1)
+DAYS = 3 * 365
+
+_POOL_SIZE = 4_000
+_POSTS_PER_ACCOUNT = 60
+
+
+def _pools(seed):
+    faker = Faker(["en_US", "ar_AA"])
+    faker.seed_instance(seed)
+    english = faker["en_US"]
+    arabic = faker["ar_AA"]
+    return {
+        "english_sentences": [english.sentence(nb_words=12) for _ in range(_POOL_SIZE)],
+        "arabic_sentences": [arabic.sentence(nb_words=10) for _ in range(_POOL_SIZE)],
+        "english_names": [english.name() for _ in range(_POOL_SIZE)],
+        "arabic_names": [arabic.name() for _ in range(_POOL_SIZE)],
+        "user_names": [english.user_name() for _ in range(_POOL_SIZE)],
+        "domains": [english.domain_name() for _ in range(_POOL_SIZE // 10)],
+        "cities": [english.city().lower().replace(" ", "") for _ in range(200)],
+    }
+
+
+def _caption(rng, pools, arabic):
+    if arabic:
+        sentences = pools["arabic_sentences"]
+        keywords = [keyword for keywords in ARABIC_THEME_KEYWORDS.values() for keyword in keywords]
+    else:
+        sentences = pools["english_sentences"]
+        keywords = _ENGLISH_KEYWORDS
+    parts = [sentences[i] for i in rng.integers(0, len(sentences), rng.integers(1, 4))]
+    # Most posts mention a few theme terms, some none at all
+    parts.extend(keywords[i] for i in rng.integers(0, len(keywords), rng.poisson(1.5)))
+    return " ".join(parts)
+
+
+_ENGLISH_KEYWORDS = [keyword for keywords in THEME_KEYWORDS.values() for keyword in keywords]
+_HASHTAGS = [keyword.replace(" ", "").replace("-", "") for keyword in _ENGLISH_KEYWORDS] + ["realestate", "luxury", "property", "investment", "forsale"]
+
+
+def generate_accounts(n_posts, seed=0, posts_per_account=_POSTS_PER_ACCOUNT):
+    """
+    Accounts with n_posts posts in total, in the layout get_data returns
+
+    Posts per account follow a long tail, about 5% of the posts have no upload_date
+    and 1% a malformed one, captions are English or (for Gulf and Egyptian accounts)
+    partly Arabic, with THEME_KEYWORDS / ARABIC_THEME_KEYWORDS terms mixed in.
+    """
+    rng = np.random.default_rng(seed)
+    pools = _pools(seed)
+
+    n_accounts = max(1, n_posts // posts_per_account)
+    # Long tail of posts per account, every account has at least one post
+    weights = rng.pareto(1.5, n_accounts) + 1
+    counts = np.ones(n_accounts, dtype=np.int64) + rng.multinomial(n_posts - n_accounts, weights / weights.sum())
+
+    countries = [country for country, _, _ in COUNTRIES]
+    country_shares = np.array([share for _, share, _ in COUNTRIES])
+    arabic_shares = {country: arabic_share for country, _, arabic_share in COUNTRIES}
+
+    accounts = []
+    post_number = 0
+    for account_number, n_account_posts in enumerate(counts):
+        country = countries[rng.choice(len(countries), p=country_shares)]
+        arabic_share = arabic_shares[country]
+        names = pools["arabic_names"] if arabic_share > 0.3 else pools["english_names"]
+        username = f"{pools['user_names'][rng.integers(len(pools['user_names']))]}{account_number}"
+        followers = int(rng.lognormal(8, 1.5))
+
+        posts = []
+        for _ in range(n_account_posts):
+            draw = rng.random()
+            if draw < 0.05:
+                upload_date = None
+            elif draw < 0.06:
+                upload_date = "unknown"
+            else:
+                upload_date = (FIRST_DAY + timedelta(days=int(rng.integers(DAYS)))).isoformat()
+            is_video = rng.random() < 0.4
+            posts.append({
+                "caption": _caption(rng, pools, rng.random() < arabic_share),
+                "hashtags": [_HASHTAGS[i] for i in rng.integers(0, len(_HASHTAGS), rng.integers(0, 8))] + [pools["cities"][rng.integers(len(pools["cities"]))]],
+                "upload_date": upload_date,
+                "number_of_likes": int(rng.lognormal(4, 1.2)),
+                "number_of_comments": int(rng.lognormal(1.5, 1)),
+                "video_view_count": int(rng.lognormal(7, 1.5)) if is_video else None,
+                "url": f"https://www.instagram.com/p/{post_number:09d}/",
+            })
+            post_number += 1
+
+        accounts.append({
+            "username": username,
+            "full_name": names[rng.integers(len(names))],
+            "followers": followers,
+            "following": int(rng.integers(0, 2_000)),
+            "country": country,
+            "external_url": f"https://www.{pools['domains'][rng.integers(len(pools['domains']))]}",
+            "posts": posts,
+        })
+
+    return accounts
+
+
+def generate_trends(n_entries, seed=0, keywords_per_theme=8, geos=TREND_GEOS):
+    """
+    Google Trends theme documents with about n_entries timeline entries in total
+
+    Every theme gets keywords_per_theme of its THEME_KEYWORDS, each with a weekly
+    interest series (0-100, trend + yearly season + noise) per geo. About 2% of the
+    values are missing, like weeks Google Trends has no data for.
+    """
+    rng = np.random.default_rng(seed)
+    themes = {theme: keywords[:keywords_per_theme] for theme, keywords in THEME_KEYWORDS.items()}
+    series = sum(len(keywords) for keywords in themes.values()) * len(geos)
+    weeks = max(2, -(-n_entries // series))
+    dates = [(FIRST_DAY + timedelta(weeks=week)).isoformat() for week in range(weeks)]
+    week_numbers = np.arange(weeks)
+
+    docs = []
+    for theme, keywords in themes.items():
+        timeline = []
+        for keyword in keywords:
+            for geo in geos:
+                base = rng.uniform(5, 60)
+                slope = rng.normal(0, 0.1)
+                season = rng.uniform(0, 10) * np.sin(2 * np.pi * week_numbers / 52 + rng.uniform(0, 2 * np.pi))
+                values = np.clip(np.rint(base + slope * week_numbers + season + rng.normal(0, 4, weeks)), 0, 100)
+                missing = rng.random(weeks) < 0.02
+                timeline.extend(
+                    {"keyword": keyword, "geo": geo, "date": day, "value": None if gap else int(value)}
+                    for day, value, gap in zip(dates, values, missing)
+                )
+        docs.append({"theme": theme, "timeline": timeline})
+
+    return docs
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from cachetools import LRUCache
+
+import perf_metrics
+from developer_cube import get_cube
+from developer_data import DATA_TTL_SECONDS, QUERY_MODE, filter_data, get_data_version, query_filtered_data
+from developer_snapshot import DashboardSnapshot
+
+
+# Filtered views and snapshots kept per process, least recently used are evicted first
+FILTER_CACHE_SIZE = int(os.environ.get("FILTER_CACHE_SIZE", 32))
+
+
+# The applied filters in a canonical, hashable form. Selections are sorted since
+# the filters don't depend on the order things were picked in.
+FilterSpec = namedtuple("FilterSpec", ["themes", "keywords", "accounts", "date_range", "countries"])
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def make_filter_spec(selected_themes=None, selected_keywords=None, selected_accounts=None, date_range=None, selected_countries=None):
+    if date_range and isinstance(date_range, tuple) and len(date_range) == 2:
+        date_range = (_as_date(date_range[0]), _as_date(date_range[1]))
+    else:
+        date_range = None
+
+    return FilterSpec(
+        themes=tuple(sorted(selected_themes or ())),
+        keywords=tuple(sorted(selected_keywords or ())),
+        accounts=tuple(sorted(selected_accounts or ())),
+        date_range=date_range,
+        countries=tuple(sorted(selected_countries or ())),
+    )
+
+
+def get_dataset_version():
+    """
+    Version the cached views are valid for. In query mode the data is read from
+    MongoDB on every miss, so entries are only trusted for DATA_TTL_SECONDS.
+    Otherwise use the version get_versioned_data returns with the data where
+    there is one, the snapshot may be reloaded between two separate reads.
+    """
+    if QUERY_MODE:
+        return ("query", int(time.time() // DATA_TTL_SECONDS))
+    return get_data_version()
+
+
+class FilterCache:
+    """
+    Bounded LRU cache of values derived from one filter state, keyed on
+    (dataset version, filter spec, name).
+
+    Entries of older dataset versions can never be hit again, they are dropped as
+    soon as a newer version is seen so they don't keep old datasets in memory.
+    """
+
+    def __init__(self, maxsize=FILTER_CACHE_SIZE):
+        self._entries = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, version, spec, name, compute):
+        key = (version, spec, name)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            if key in self._entries:
+                self.hits += 1
+                perf_metrics.note_cache(True)
+                return self._entries[key]
+            self.misses += 1
+        perf_metrics.note_cache(False)
+
+        # Computed outside the lock so other filter states are not blocked meanwhile
+        value = compute()
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "maxsize": self._entries.maxsize,
+                "version": self._version,
+            }
+
+
+# Shared by every session, they all look at the same dataset
+_filter_cache = FilterCache()
+
+
+def get_filtered_data(data, spec, version=None):
+    """
+    Filtered view of the data for a filter spec
+
+    Args:
+        data (list): List of account data, or None in query mode to filter inside MongoDB
+        spec (FilterSpec): Applied filters
+        version: Dataset version, defaults to get_dataset_version()
+    """
+    if version is None:
+        version = get_dataset_version()
+
+    def compute():
+        if data is None:
+            return query_filtered_data(*spec)
+        return filter_data(data, *spec)
+
+    return _filter_cache.get_or_compute(version, spec, "filtered", compute)
+
+
+def get_dashboard_snapshot(filtered_data, spec, version=None, data=None):
+    """
+    DashboardSnapshot of a filtered view, computed once per filter spec and dataset version
+
+    Pass the unfiltered data to roll the tiles and charts up from its cube.
+    """
+    if version is None:
+        version = get_dataset_version()
+
+    def compute():
+        cube = get_cube(data) if data is not None else None
+        snapshot = DashboardSnapshot(filtered_data, cube=cube, spec=spec)
+        perf_metrics.log(f"Dashboard snapshot built in {snapshot.total_time * 1000:.0f}ms: {snapshot.timings_summary()}")
+        return snapshot
+
+    return _filter_cache.get_or_compute(version, spec, "snapshot", compute)
+
+
+def get_filter_cache_stats():
+    return _filter_cache.stats()
+
+
+def clear_filter_cache():
+    _filter_cache.clear()
@@ -0,0 +1,199 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import perf_metrics
+from developer_index import NO_DATE, first_theme_masks, from_day_ordinal, to_day_ordinal
+
+
+# Month of posts without a valid upload_date, they count in the totals but not in the trends
+NO_MONTH = np.iinfo(np.int32).max
+
+DIMENSIONS = ["account", "country", "month", "theme_mask"]
+MEASURES = ["posts", "likes", "comments", "views", "engagement", "reach_units"]
+
+# Twentieths of a reach, as in developer_data.get_estimated_reach
+REACH_UNITS = 20
+
+
+def _month_ordinals(day_ordinals):
+    """Months since 1970-01 of day ordinals, NO_MONTH for posts without a date"""
+    months = day_ordinals.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    months[day_ordinals == NO_DATE] = NO_MONTH
+    return months
+
+
+def _first_day(month):
+    return int(np.datetime64(int(month), "M").astype("datetime64[D]").astype(np.int64))
+
+
+class DeveloperCube:
+    """
+    Post measures of a loaded dataset pre-aggregated by (account, country, month, theme mask)
+
+    Each cell holds the number of posts, likes, comments, views, engagement and
+    estimated reach contribution (estimate_post_reach, in integer twentieths so
+    roll-ups are exact) of its posts. The theme dimension is the full theme bitmask
+    of a post rather than one cell per theme, so a post in several themes is still
+    counted once when themes are rolled up.
+
+    Cells only have month resolution. A date range that starts or ends inside a
+    month takes those edge months from the posts themselves (a binary search in
+    the post index), every month in between comes from the cells.
+    """
+
+    def __init__(self, data, index):
+        self.index = index
+        self.usernames = [account.get("username", "") for account in data]
+        self.countries = [account.get("country", "") for account in data]
+        self.country_codes, self.country_names = pd.factorize(pd.Series(self.countries, dtype="object").fillna(""))
+
+        posts_per_account = [len(account.get("posts", [])) for account in data]
+        followers = [account.get("followers", 0) or 0 for account in data]
+        likes = []
+        comments = []
+        views = []
+        for account in data:
+            for post in account.get("posts", []):
+                likes.append(post.get("number_of_likes", 0) or 0)
+                comments.append(post.get("number_of_comments", 0) or 0)
+                views.append(post.get("video_view_count", 0) or 0)
+
+        # One row per post, in index row order
+        account_codes = np.repeat(np.arange(len(data), dtype=np.int64), posts_per_account)
+        facts = pd.DataFrame({
+            "account": account_codes,
+            "country": self.country_codes[account_codes],
+            "month": _month_ordinals(index.day_ordinals),
+            "theme_mask": index.theme_masks,
+            "posts": np.ones(len(account_codes), dtype=np.int64),
+            "likes": np.array(likes, dtype=np.int64),
+            "comments": np.array(comments, dtype=np.int64),
+            "views": np.array(views, dtype=np.int64),
+        })
+        facts["engagement"] = facts["likes"] + facts["comments"] + facts["views"]
+        # Same heuristic as estimate_post_reach, 0.1 * followers + 0.05 * engagement in twentieths
+        facts["reach_units"] = 2 * np.repeat(np.array(followers, dtype=np.int64), posts_per_account) + facts["engagement"]
+
+        self.facts = facts
+        self.cells = self._aggregate(facts)
+
+    @staticmethod
+    def _aggregate(rows):
+        return rows.groupby(DIMENSIONS, sort=False)[MEASURES].sum().reset_index()
+
+    def _selection(self, frame, selected_themes, selected_accounts, selected_countries):
+        selected = np.ones(len(frame), dtype=bool)
+        if selected_accounts:
+            accounts = set(selected_accounts)
+            account_selected = np.array([username in accounts for username in self.usernames], dtype=bool)
+            selected &= account_selected[frame["account"].to_numpy()]
+        if selected_countries:
+            countries = set(selected_countries)
+            country_selected = np.array([country in countries for country in self.countries], dtype=bool)
+            selected &= country_selected[frame["account"].to_numpy()]
+        if selected_themes:
+            selected &= (frame["theme_mask"].to_numpy() & self.index.theme_bits(selected_themes)) != 0
+        return selected
+
+    def rollup(self, selected_themes=None, selected_accounts=None, date_range=None, selected_countries=None):
+        """
+        Cells of the posts filter_data would keep for these filters, see CubeRollup
+
+        Keyword filters need the post level data and are not supported here.
+        """
+        cells = self.cells[self._selection(self.cells, selected_themes, selected_accounts, selected_countries)]
+
+        if date_range:
+            start_day, end_day = to_day_ordinal(date_range[0]), to_day_ordinal(date_range[1])
+            start_month, end_month = _month_ordinals(np.array([start_day, end_day]))
+            months = cells["month"].to_numpy()
+            cells = cells[(months > start_month) & (months < end_month)]
+
+            # Posts of the (possibly partial) first and last month of the range
+            end_of_start_month = _first_day(start_month + 1) - 1
+            edge_rows = [self.index.rows_in_date_range(from_day_ordinal(start_day), from_day_ordinal(min(end_day, end_of_start_month)))]
+            if end_month != start_month:
+                edge_rows.append(self.index.rows_in_date_range(from_day_ordinal(max(start_day, _first_day(end_month))), from_day_ordinal(end_day)))
+            edge_facts = self.facts.iloc[np.sort(np.concatenate(edge_rows))]
+            edge_facts = edge_facts[self._selection(edge_facts, selected_themes, selected_accounts, selected_countries)]
+            cells = pd.concat([cells, self._aggregate(edge_facts)], ignore_index=True)
+
+        any_filter = selected_themes or selected_accounts or date_range or selected_countries
+        return CubeRollup(self, cells, all_accounts=not any_filter)
+
+
+class CubeRollup:
+    """
+    Dashboard figures of a set of cube cells, the same values the post level
+    functions give for the filtered data (get_total_engagements, get_post_trend_data, ...)
+    """
+
+    def __init__(self, cube, cells, all_accounts=False):
+        # filter_data returns the dataset untouched when no filter is set, accounts
+        # without posts included, otherwise only accounts with a matching post
+        if all_accounts:
+            accounts = np.arange(len(cube.usernames))
+        else:
+            accounts = np.unique(cells["account"].to_numpy())
+        country_codes = np.unique(cube.country_codes[accounts])
+        self.total_accounts = len(accounts)
+        self.total_countries = sum(1 for code in country_codes if code >= 0 and cube.country_names[code])
+
+        self.total_posts = int(cells["posts"].sum())
+        self.total_engagements = int(cells["engagement"].sum())
+        self.estimated_reach = int(cells["reach_units"].sum()) // REACH_UNITS
+
+        dated = cells[cells["month"] != NO_MONTH]
+        self.post_trend = self._trend(dated, "posts", "post_count")
+        self.engagement_trend = self._trend(dated, "engagement", "total_engagement")
+        self.theme_distribution_over_time = self._theme_over_time(cube.index, dated)
+
+    @staticmethod
+    def _trend(dated, measure, name):
+        if dated.empty:
+            return pd.DataFrame(columns=["month", name])
+        by_month = dated.groupby("month")[measure].sum()
+        return pd.DataFrame({
+            "month": by_month.index.to_numpy().astype("datetime64[M]").astype("datetime64[ns]"),
+            name: by_month.to_numpy(),
+        })
+
+    @staticmethod
+    def _theme_over_time(index, dated):
+        if dated.empty:
+            return pd.DataFrame(columns=["Month", "Theme", "Post Count"])
+        # Each post counts towards its first theme
+        theme_by_mask = {1 << bit: theme for bit, theme in enumerate(index.theme_names)}
+        theme_data_over_time = pd.DataFrame({
+            "Month": np.datetime_as_string(dated["month"].to_numpy().astype("datetime64[M]"), unit="M"),
+            "Theme": pd.Series(first_theme_masks(dated["theme_mask"].to_numpy())).map(theme_by_mask).to_numpy(),
+            "Post Count": dated["posts"].to_numpy(),
+        })
+        return theme_data_over_time.groupby(["Month", "Theme"])["Post Count"].sum().reset_index()
+
+
+# Cubes of the loaded datasets, newest last, same lifetime as the post indexes
+_cube_lock = threading.Lock()
+_cubes = []
+MAX_CUBES = 2
+
+
+def cube_dataset(data, index):
+    """Build and register the cube of a freshly loaded and indexed dataset"""
+    cube = DeveloperCube(data, index)
+    with _cube_lock:
+        _cubes.append((data, cube))
+        del _cubes[:-MAX_CUBES]
+    perf_metrics.log(f"Built the dashboard cube: {len(cube.cells)} cells for {len(cube.facts)} posts")
+    return cube
+
+
+def get_cube(data):
+    """Cube of a loaded dataset, or None if data is not one"""
+    with _cube_lock:
+        for cube_data, cube in reversed(_cubes):
+            if cube_data is data:
+                return cube
+    return None
@@ -1,62 +1,25 @@
+import os
 import streamlit as st
 
 import plotly.express as px
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
 import pandas as pd
-from datetime import datetime, timedelta
-import hashlib
-import json
-from functools import lru_cache
+import perf_metrics
 from developer_data import *
+from developer_cache import get_dashboard_snapshot, get_dataset_version, get_filtered_data, make_filter_spec
+from developer_table import PAGE_SIZES, TABLE_COLUMNS
+from developer_export import EXPORT_FORMATS, export_posts
 
 
 
+@st.fragment
+@perf_metrics.timed("dashboard_developer/filter_panel", kind="section")
+def filter_panel(data, all_usernames, all_countries, min_date, max_date):
+    """
+    Filter inputs and the Apply / Clear / Refresh buttons
 
-
-def dashboard_developer():
-    # Initialize session state for storing filter values
-    if 'filter_themes' not in st.session_state:
-        st.session_state['filter_themes'] = []
-    if 'filter_keywords' not in st.session_state:
-        st.session_state['filter_keywords'] = []
-    if 'filter_accounts' not in st.session_state:
-        st.session_state['filter_accounts'] = []
-    if 'filter_date_range' not in st.session_state:
-        st.session_state['filter_date_range'] = None
-    if 'filter_countries' not in st.session_state:
-        st.session_state['filter_countries'] = []
-
-
-
-    # Initialize session state for applied filters
-    if 'selected_themes' not in st.session_state:
-        st.session_state['selected_themes'] = []
-    if 'selected_keywords' not in st.session_state:
-        st.session_state['selected_keywords'] = []
-    if 'selected_accounts' not in st.session_state:
-        st.session_state['selected_accounts'] = []
-    if 'date_range' not in st.session_state:
-        st.session_state['date_range'] = None
-    if 'selected_countries' not in st.session_state:
-        st.session_state['selected_countries'] = []
-
-
-    data = get_data()
-
-    print(f"Total accounts = {len(data)}")
-
-    # Get list of all usernames for account filter
-    all_usernames = list(set([account.get('username', '') for account in data]))
-    all_usernames.sort()  # Sort alphabetically for better UX
-
-    # Get min and max dates from the data for the date range filter
-    min_date, max_date = get_date_range(data)
-    # Set default date range if not already in session state
-    if st.session_state['filter_date_range'] is None and min_date and max_date:
-        st.session_state['filter_date_range'] = (min_date, max_date)
-        st.session_state['date_range'] = (min_date, max_date)  # Also set applied date range
-
+    Runs as a fragment: editing a filter only reruns this panel, the buttons
+    rerun the whole dashboard once the applied filters change.
+    """
     # Define callback functions for all filters
     def update_theme_selection():
         if "theme_filter_callback" in st.session_state:
@@ -87,9 +50,6 @@ def dashboard_developer():
                 # For single date selection
                 st.session_state['filter_date_range'] = (date_input, date_input)
 
-    # Set the title
-    st.subheader("Developer Dashboard")
-
     # Create a container for filters
     filter_container = st.container()
 
@@ -131,9 +91,6 @@ def dashboard_developer():
             )
         
         with filter_row1_col3:
-            # Get all unique countries from data
-            all_countries = sorted(list(set([account.get('country', '') for account in data if account.get('country')])))
-
             # Country filter
             st.multiselect(
                 "Filter by Country",
@@ -165,8 +122,14 @@ def dashboard_developer():
                     on_change=update_date_selection
                 )
 
+            # Report posts the date filter can never match
+            if data is not None:
+                date_report = get_date_report(data)
+                if date_report["malformed"]:
+                    st.caption(f"{date_report['malformed']} posts have a malformed upload date and are left out when filtering by date.")
+
         # Add buttons in a row
-        button_col1, button_col2 = st.columns([1, 1])
+        button_col1, button_col2, button_col3 = st.columns([1, 1, 1])
         
         with button_col1:
             # Apply Filters button
@@ -176,7 +139,9 @@ def dashboard_developer():
                 st.session_state['selected_accounts'] = st.session_state['filter_accounts']
                 st.session_state['selected_countries'] = st.session_state['filter_countries']  
                 st.session_state['date_range'] = st.session_state['filter_date_range']
-                st.toast("Filters Applied", icon="✅")
+                # Toasts don't survive a rerun, the dashboard shows it on the next run
+                st.session_state['filters_applied'] = True
+                st.rerun()
 
         
         with button_col2:
@@ -200,16 +165,170 @@ def dashboard_developer():
                 
                 st.rerun()
 
-    # Apply filters to data based on the applied filters (not the filter input values)
-    filtered_data = filter_data(
-        data, 
-        st.session_state['selected_themes'], 
-        st.session_state['selected_keywords'],
-        st.session_state['selected_accounts'],
-        st.session_state['date_range'],
-        st.session_state['selected_countries']
+        with button_col3:
+            # Reload the shared dataset snapshot from MongoDB
+            if st.button("Refresh Data"):
+                refresh_data()
+                st.rerun()
+
+
+@st.fragment
+@perf_metrics.timed("dashboard_developer/accounts_section", kind="section")
+def accounts_section(snapshot, filtered_data, filter_spec, dataset_version):
+    """Accounts table and export, a fragment so its widgets don't rerun the charts"""
+    # Get filtered accounts
+    accounts_table = snapshot.accounts
+
+    # ⚙️ Column config for links
+    column_config = {
+        "Profile URL": st.column_config.LinkColumn("Profile URL", display_text="Open"),
+        "External URL": st.column_config.LinkColumn("External URL", display_text="Open"),
+        "Post URL": st.column_config.LinkColumn("Post URL", display_text="Open"),
+    }
+
+    # 🔎 Search, sort and page on the server, only the visible page is sent to the browser
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        table_search = st.text_input("🔎 Search Accounts", key="table_search", placeholder="User name, full name, country or URL")
+    with col2:
+        table_sort = st.selectbox("Sort by", ["Default"] + TABLE_COLUMNS, key="table_sort")
+    with col3:
+        table_order = st.selectbox("Order", ["Ascending", "Descending"], key="table_order")
+    with col4:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key="table_page_size")
+
+    total_rows = accounts_table.count(table_search)
+    total_pages = max(1, -(-total_rows // page_size))
+    # The page count changes with the search and page size. It is clamped here rather
+    # than given as max_value, a new max_value would make a new widget and reset the page.
+    if st.session_state.get("table_page", 1) > total_pages:
+        st.session_state["table_page"] = total_pages
+    page = st.number_input("Page", min_value=1, step=1, key="table_page")
+
+    # Rows are numbered from 1 across pages
+    df, total_rows = accounts_table.page(
+        page,
+        page_size,
+        search=table_search,
+        sort_by=None if table_sort == "Default" else table_sort,
+        ascending=table_order == "Ascending",
     )
 
+    # 📋 Show filtered table
+    st.dataframe(df, column_config=column_config)
+    st.caption(f"Page {page} of {total_pages} · {total_rows} posts")
+
+    # 📥 Export the filtered posts, written to a temporary file in chunks
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        export_format = st.selectbox("Export Format", list(EXPORT_FORMATS), key="export_format")
+    with col2:
+        st.write("")
+        prepare_export = st.button("Prepare Export")
+
+    # Only offered while it still matches the applied filters, dropped as soon as it doesn't
+    export_key = (filter_spec, dataset_version, export_format)
+    export = st.session_state.get("export_download")
+    if export and export["key"] != export_key:
+        discard_export()
+        export = None
+
+    if prepare_export:
+        # A new export replaces the previous file of the same filters
+        discard_export()
+        with st.spinner("Writing export..."):
+            path = export_posts(filtered_data, export_format)
+        # Only the path is kept in the session, the file stays on disk until it is downloaded
+        export = {"key": export_key, "path": path}
+        st.session_state["export_download"] = export
+
+    if export:
+        extension, mime = EXPORT_FORMATS[export_format]
+        try:
+            # Opened again on every rerun of this fragment. Streamlit reads it into its
+            # media storage to serve it, there is no way to stream the file from disk.
+            with open(export["path"], "rb") as f:
+                st.download_button("📥 Download Posts", f, file_name=f"developer-posts.{extension}", mime=mime, on_click=discard_export)
+        except FileNotFoundError:
+            del st.session_state["export_download"]
+
+
+def discard_export():
+    """Remove the prepared export file and forget it, once downloaded or out of date"""
+    export = st.session_state.pop("export_download", None)
+    if export and os.path.exists(export["path"]):
+        os.remove(export["path"])
+
+
+def dashboard_developer():
+    # Initialize session state for storing filter values
+    if 'filter_themes' not in st.session_state:
+        st.session_state['filter_themes'] = []
+    if 'filter_keywords' not in st.session_state:
+        st.session_state['filter_keywords'] = []
+    if 'filter_accounts' not in st.session_state:
+        st.session_state['filter_accounts'] = []
+    if 'filter_date_range' not in st.session_state:
+        st.session_state['filter_date_range'] = None
+    if 'filter_countries' not in st.session_state:
+        st.session_state['filter_countries'] = []
+
+
+
+    # Initialize session state for applied filters
+    if 'selected_themes' not in st.session_state:
+        st.session_state['selected_themes'] = []
+    if 'selected_keywords' not in st.session_state:
+        st.session_state['selected_keywords'] = []
+    if 'selected_accounts' not in st.session_state:
+        st.session_state['selected_accounts'] = []
+    if 'date_range' not in st.session_state:
+        st.session_state['date_range'] = None
+    if 'selected_countries' not in st.session_state:
+        st.session_state['selected_countries'] = []
+
+
+    with perf_metrics.section("dashboard_developer/load_data") as timer:
+        if QUERY_MODE:
+            # Filters run inside MongoDB, only the filter options are needed up front
+            data = None
+            dataset_version = get_dataset_version()
+        else:
+            # Read together, a reload in between would cache old data under the new version
+            data, dataset_version = get_versioned_data()
+            print(f"Total accounts = {len(data)}")
+            timer.rows_out = len(data)
+
+    # Usernames and countries sorted alphabetically for better UX, min and max dates for the date range filter
+    with perf_metrics.section("dashboard_developer/filter_options"):
+        all_usernames, all_countries, min_date, max_date = get_filter_options(data)
+        # Set default date range if not already in session state
+        if st.session_state['filter_date_range'] is None and min_date and max_date:
+            st.session_state['filter_date_range'] = (min_date, max_date)
+            st.session_state['date_range'] = (min_date, max_date)  # Also set applied date range
+
+    # Set the title
+    st.subheader("Developer Dashboard")
+
+    # Filter inputs rerun on their own, the dashboard only reruns when filters are applied
+    filter_panel(data, all_usernames, all_countries, min_date, max_date)
+    if st.session_state.pop('filters_applied', False):
+        st.toast("Filters Applied", icon="✅")
+
+    # Apply filters to data based on the applied filters (not the filter input values)
+    # The filtered view and everything derived from it are cached per filter spec and dataset version.
+    # In query mode data is None and the filters run inside MongoDB
+    with perf_metrics.section("dashboard_developer/filtered_data", rows_in=len(data) if data is not None else None) as timer:
+        filter_spec = make_filter_spec(
+            st.session_state['selected_themes'], 
+            st.session_state['selected_keywords'],
+            st.session_state['selected_accounts'],
+            st.session_state['date_range'],
+            st.session_state['selected_countries']
+        )
+        filtered_data = get_filtered_data(data, filter_spec, dataset_version)
+        timer.rows_out = len(filtered_data) if filtered_data is not None else None
+
     # Display the currently applied filters
     if (st.session_state['selected_themes'] or 
         st.session_state['selected_keywords'] or 
@@ -240,25 +359,30 @@ def dashboard_developer():
 
 
 
+    # Every metric, table and chart below is rendered from one snapshot of the filtered data
+    with perf_metrics.section("dashboard_developer/snapshot", rows_in=len(filtered_data) if filtered_data is not None else None) as timer:
+        with st.spinner("Calculating dashboard..."):
+            snapshot = get_dashboard_snapshot(filtered_data, filter_spec, dataset_version, data)
+        timer.rows_out = snapshot.total_posts
+
     # Dashboard metrics with filtered data
-    col1, col2, col3, col4, col5, col6 = st.columns(6)
-    with col1:
-        st.metric("Total Accounts", get_total_accounts(filtered_data))
-    with col2:
-        st.metric("🌍 Total Countries", get_total_countries(filtered_data))
-    with col3:
-        st.metric("📸 Total Posts", format_number(get_total_posts(filtered_data)))
-    with col4:
-        st.metric("💬 Total Engagements", format_number(get_total_engagements(filtered_data)))
-    with col5:
-        total_posts = get_total_posts(filtered_data)
-        if total_posts > 0:
-            ape = round(get_total_engagements(filtered_data) / total_posts)
-            st.metric("👥 Avg Post Engagement", format_number(ape))
-        else:
-            st.metric("👥 Avg Post Engagement", "0")
-    with col6:
-        st.metric("🌟 Reach", format_number(get_estimated_reach(filtered_data)))
+    with perf_metrics.section("dashboard_developer/metrics"):
+        col1, col2, col3, col4, col5, col6 = st.columns(6)
+        with col1:
+            st.metric("Total Accounts", snapshot.total_accounts)
+        with col2:
+            st.metric("🌍 Total Countries", snapshot.total_countries)
+        with col3:
+            st.metric("📸 Total Posts", format_number(snapshot.total_posts))
+        with col4:
+            st.metric("💬 Total Engagements", format_number(snapshot.total_engagements))
+        with col5:
+            if snapshot.total_posts > 0:
+                st.metric("👥 Avg Post Engagement", format_number(snapshot.avg_engagement))
+            else:
+                st.metric("👥 Avg Post Engagement", "0")
+        with col6:
+            st.metric("🌟 Reach", format_number(snapshot.estimated_reach))
 
 
     # Apply styles
@@ -301,211 +425,155 @@ def dashboard_developer():
 
 
 
-    # Get filtered accounts
-    df = get_accounts(filtered_data)
-
-    # ⚙️ Column config for links
-    column_config = {
-        "Profile URL": st.column_config.LinkColumn("Profile URL", display_text="Open"),
-        "External URL": st.column_config.LinkColumn("External URL", display_text="Open"),
-        "Post URL": st.column_config.LinkColumn("Post URL", display_text="Open"),
-    }
-
-    # Start index from 1 instead of 0
-    df.index = range(1, len(df) + 1)
-
-    # 📋 Show filtered table
-    st.dataframe(df, column_config=column_config)
+    # Searching, sorting, paging and exporting rerun only the table section
+    accounts_section(snapshot, filtered_data, filter_spec, dataset_version)
 
     # --- POST TREND LINE ---
-    post_counts_by_month = get_post_trend_data(filtered_data)
+    with perf_metrics.section("dashboard_developer/post_trend") as timer:
+        post_counts_by_month = snapshot.post_trend
+        timer.rows_in = len(post_counts_by_month)
 
-    st.caption("Post Trend Line")
-    if not post_counts_by_month.empty:
-        st.line_chart(post_counts_by_month, x="month", y="post_count", x_label="Month", y_label="Post Count", use_container_width=True)
-    else:
-        st.info("No post trend data available for the selected filters.")
+        st.caption("Post Trend Line")
+        if not post_counts_by_month.empty:
+            st.line_chart(post_counts_by_month, x="month", y="post_count", x_label="Month", y_label="Post Count", use_container_width=True)
+        else:
+            st.info("No post trend data available for the selected filters.")
 
     # --- ENGAGEMENT TREND LINE ---
-    engagement_by_month = get_engagement_trend_data(filtered_data)
+    with perf_metrics.section("dashboard_developer/engagement_trend") as timer:
+        engagement_by_month = snapshot.engagement_trend
+        timer.rows_in = len(engagement_by_month)
 
-    st.caption("Engagement Trend Line")
-    if not engagement_by_month.empty:
-        st.line_chart(engagement_by_month, x="month", y="total_engagement", x_label="Month", y_label="Engagement", use_container_width=True, )
-    else:
-        st.info("No engagement trend data available for the selected filters.")
+        st.caption("Engagement Trend Line")
+        if not engagement_by_month.empty:
+            st.line_chart(engagement_by_month, x="month", y="total_engagement", x_label="Month", y_label="Engagement", use_container_width=True, )
+        else:
+            st.info("No engagement trend data available for the selected filters.")
 
     # Get the theme distribution over time
-    theme_distribution_over_time = get_theme_distribution_over_time(filtered_data)
-
-    st.caption("Theme Distribution Over Time")
-
-    # Use st.cache_data to cache the theme distribution over time calculation
-    @st.cache_data(ttl=3600)  # Cache results for 1 hour
-    def get_cached_theme_distribution_over_time(data_hash):
-        # This is a trick to force recalculation when filtered_data changes
-        return get_theme_distribution_over_time(filtered_data)
-
-    # Create a hash of the filtered data to track changes
-    data_hash = hash(str([(a.get('username', ''), len(a.get('posts', []))) for a in filtered_data]))
-    theme_distribution_over_time = get_cached_theme_distribution_over_time(data_hash)
-
-    # Check if theme distribution over time data exists
-    if not theme_distribution_over_time.empty:
-        # Prepare the data - include all themes without limiting to top 5
-        themes_to_include = list(theme_distribution_over_time['Theme'].unique())
-        if 'Others' in theme_distribution_over_time['Theme'].unique() and 'Others' not in themes_to_include:
-            themes_to_include.append('Others')
+    with perf_metrics.section("dashboard_developer/theme_distribution_over_time") as timer:
+        theme_distribution_over_time = snapshot.theme_distribution_over_time
+        timer.rows_in = len(theme_distribution_over_time)
+
+        st.caption("Theme Distribution Over Time")
+
+        # Check if theme distribution over time data exists
+        if not theme_distribution_over_time.empty:
+            # Prepare the data - include all themes without limiting to top 5
+            themes_to_include = list(theme_distribution_over_time['Theme'].unique())
+            if 'Others' in theme_distribution_over_time['Theme'].unique() and 'Others' not in themes_to_include:
+                themes_to_include.append('Others')
         
-        stream_data = theme_distribution_over_time[theme_distribution_over_time['Theme'].isin(themes_to_include)]
-        stream_data = stream_data.groupby(['Month', 'Theme']).agg({'Post Count': 'sum'}).reset_index()
+            stream_data = theme_distribution_over_time[theme_distribution_over_time['Theme'].isin(themes_to_include)]
+            stream_data = stream_data.groupby(['Month', 'Theme']).agg({'Post Count': 'sum'}).reset_index()
         
-        # Apply theme filter to streamgraph if themes are selected
-        if st.session_state['selected_themes']:
-            filtered_themes = [t for t in st.session_state['selected_themes'] if t in stream_data['Theme'].unique()]
-            if filtered_themes:
-                stream_data = stream_data[stream_data['Theme'].isin(filtered_themes)]
+            # Apply theme filter to streamgraph if themes are selected
+            if st.session_state['selected_themes']:
+                filtered_themes = [t for t in st.session_state['selected_themes'] if t in stream_data['Theme'].unique()]
+                if filtered_themes:
+                    stream_data = stream_data[stream_data['Theme'].isin(filtered_themes)]
         
-        # Only display the graph if we have data after filtering
-        if not stream_data.empty:
-            # Create a streamgraph using plotly with simplified settings
-            fig_stream = px.area(
-                stream_data,
-                x="Month", 
-                y="Post Count", 
-                color="Theme",
-                # Removed line_group for better performance
-            )
+            # Only display the graph if we have data after filtering
+            if not stream_data.empty:
+                # Create a streamgraph using plotly with simplified settings
+                fig_stream = px.area(
+                    stream_data,
+                    x="Month", 
+                    y="Post Count", 
+                    color="Theme",
+                    # Removed line_group for better performance
+                )
 
-            # Simplified layout
-            fig_stream.update_layout(
-                xaxis_title="Month", 
-                yaxis_title="Post Count",
-                margin=dict(l=20, r=20, t=30, b=20)
-            )
+                # Simplified layout
+                fig_stream.update_layout(
+                    xaxis_title="Month", 
+                    yaxis_title="Post Count",
+                    margin=dict(l=20, r=20, t=30, b=20)
+                )
 
-            # Display the plot with static rendering for faster loading
-            st.plotly_chart(fig_stream, use_container_width=True, config={'staticPlot': True})
+                # Display the plot with static rendering for faster loading
+                st.plotly_chart(fig_stream, use_container_width=True, config={'staticPlot': True})
+            else:
+                st.info("No theme distribution over time data available for the selected filters.")
         else:
             st.info("No theme distribution over time data available for the selected filters.")
-    else:
-        st.info("No theme distribution over time data available for the selected filters.")
 
     # Get the top 10 most used keywords
-    top_keyword_data = get_top_keywords(filtered_data, top_n=15)
-
-    st.caption("Top Keywords")
-
-    # Check if top keyword data exists
-    if not top_keyword_data.empty and len(top_keyword_data) > 0:
-        # Create the vertical bar chart for top keywords
-        fig_bar = px.bar(
-            top_keyword_data, 
-            x='Keyword', 
-            y='Count',
-            color='Keyword',
-            text='Count',
-            color_discrete_sequence=px.colors.qualitative.Vivid
-        )
+    with perf_metrics.section("dashboard_developer/top_keywords") as timer:
+        top_keyword_data = snapshot.top_keywords
+        timer.rows_in = len(top_keyword_data)
+
+        st.caption("Top Keywords")
+
+        # Check if top keyword data exists
+        if not top_keyword_data.empty and len(top_keyword_data) > 0:
+            # Create the vertical bar chart for top keywords
+            fig_bar = px.bar(
+                top_keyword_data, 
+                x='Keyword', 
+                y='Count',
+                color='Keyword',
+                text='Count',
+                color_discrete_sequence=px.colors.qualitative.Vivid
+            )
 
-        fig_bar.update_traces(textposition='outside')
-        fig_bar.update_layout(showlegend=False)
-
-        # Display the plot in Streamlit
-        st.plotly_chart(fig_bar, use_container_width=True, key="top_keyword_bar_chart")
-    else:
-        st.info("No keyword data available for the selected filters.")
-
-    # Calculate a stable hash for the filtered data to use as a cache key
-    def get_data_hash(data):
-        """Create a stable hash of the filtered data for caching purposes"""
-        # Extract just the essential details to create a more stable hash
-        hash_data = []
-        for account in data:
-            acc_data = {
-                "username": account.get("username", ""),
-                "post_count": len(account.get("posts", [])),
-                # Add a hash of the first 5 posts to detect content changes
-                "post_sample": [post.get("upload_date", "") + (post.get("caption", "") or "")[:50] 
-                            for post in account.get("posts", [])[:5]]
-            }
-            hash_data.append(acc_data)
-        
-        # Create a stable string representation and hash it
-        data_str = json.dumps(hash_data, sort_keys=True)
-        return hashlib.md5(data_str.encode()).hexdigest()
-
-    # Add these decorators to cache the theme distributions
-    @st.cache_data(ttl=3600)
-    def cached_theme_distribution(data_hash, allow_multiple_themes=True, fuzzy_threshold=80):
-        """Cached version of theme distribution calculation"""
-        try:
-            return get_theme_distribution(filtered_data, allow_multiple_themes, fuzzy_threshold)
-        except Exception as e:
-            st.error(f"Error calculating theme distribution: {str(e)}")
-            return {}
-
-    @st.cache_data(ttl=3600)
-    def cached_theme_distribution_over_time(data_hash):
-        """Cached version of theme distribution over time calculation"""
-        try:
-            return get_theme_distribution_over_time(filtered_data)
-        except Exception as e:
-            st.error(f"Error calculating theme distribution over time: {str(e)}")
-            return {}
-            
-    # Replace the Theme Distribution section with this code
-    st.markdown(
-        "<p style='text-align: center; color: gray; font-size: 0.9rem;'>Theme Distribution</p>", 
-        unsafe_allow_html=True
-    )
+            fig_bar.update_traces(textposition='outside')
+            fig_bar.update_layout(showlegend=False)
 
-    # Get a hash of the current filtered data
-    current_data_hash = get_data_hash(filtered_data)
+            # Display the plot in Streamlit
+            st.plotly_chart(fig_bar, use_container_width=True, key="top_keyword_bar_chart")
+        else:
+            st.info("No keyword data available for the selected filters.")
 
-    # Use the cached version
-    with st.spinner("Calculating theme distribution..."):
-        theme_distribution = cached_theme_distribution(current_data_hash)
+    # Replace the Theme Distribution section with this code
+    with perf_metrics.section("dashboard_developer/theme_distribution") as timer:
+        st.markdown(
+            "<p style='text-align: center; color: gray; font-size: 0.9rem;'>Theme Distribution</p>", 
+            unsafe_allow_html=True
+        )
 
-    col1, col2 = st.columns(2)
+        theme_distribution = snapshot.theme_distribution
+        timer.rows_in = len(theme_distribution)
 
-    # Check if there's any data first before processing
-    if theme_distribution and sum(theme_distribution.values()) > 0:
-        # Create dataframe once
-        theme_data = pd.DataFrame(list(theme_distribution.items()), 
-                                columns=["Theme", "Post Count"])
-        theme_data_sorted = theme_data.sort_values(by='Post Count', ascending=False)
+        col1, col2 = st.columns(2)
+
+        # Check if there's any data first before processing
+        if theme_distribution and sum(theme_distribution.values()) > 0:
+            # Create dataframe once
+            theme_data = pd.DataFrame(list(theme_distribution.items()), 
+                                    columns=["Theme", "Post Count"])
+            theme_data_sorted = theme_data.sort_values(by='Post Count', ascending=False)
         
-        with col1:
-            # Add progress indicator
-            with st.spinner("Rendering pie chart..."):
-                fig_pie = px.pie(
-                    names=theme_data_sorted["Theme"],
-                    values=theme_data_sorted["Post Count"],
-                    color_discrete_sequence=px.colors.qualitative.Dark2
-                )
-                fig_pie.update_traces(textinfo='percent')
-                # Simplify for better performance
-                fig_pie.update_layout(margin=dict(l=10, r=10, t=10, b=10))
-                st.plotly_chart(fig_pie, use_container_width=True)
+            with col1:
+                # Add progress indicator
+                with st.spinner("Rendering pie chart..."):
+                    fig_pie = px.pie(
+                        names=theme_data_sorted["Theme"],
+                        values=theme_data_sorted["Post Count"],
+                        color_discrete_sequence=px.colors.qualitative.Dark2
+                    )
+                    fig_pie.update_traces(textinfo='percent')
+                    # Simplify for better performance
+                    fig_pie.update_layout(margin=dict(l=10, r=10, t=10, b=10))
+                    st.plotly_chart(fig_pie, use_container_width=True)
         
-        with col2:
-            # Add progress indicator
-            with st.spinner("Rendering bar chart..."):
-                fig_bar = px.bar(
-                    theme_data_sorted,
-                    x='Post Count', 
-                    y='Theme',
-                    orientation='h',
-                    color='Theme',
-                    text='Post Count',
-                    color_discrete_sequence=px.colors.qualitative.Vivid
-                )
-                fig_bar.update_traces(textposition='outside')
-                fig_bar.update_layout(showlegend=False, margin=dict(l=10, r=10, t=10, b=10))
-                st.plotly_chart(fig_bar, use_container_width=True)
-    else:
-        # Display message once and reuse
-        no_data_message = "No theme distribution data available for the selected filters."
-        col1.info(no_data_message)
-        col2.info(no_data_message)
\ No newline at end of file
+            with col2:
+                # Add progress indicator
+                with st.spinner("Rendering bar chart..."):
+                    fig_bar = px.bar(
+                        theme_data_sorted,
+                        x='Post Count', 
+                        y='Theme',
+                        orientation='h',
+                        color='Theme',
+                        text='Post Count',
+                        color_discrete_sequence=px.colors.qualitative.Vivid
+                    )
+                    fig_bar.update_traces(textposition='outside')
+                    fig_bar.update_layout(showlegend=False, margin=dict(l=10, r=10, t=10, b=10))
+                    st.plotly_chart(fig_bar, use_container_width=True)
+        else:
+            # Display message once and reuse
+            no_data_message = "No theme distribution data available for the selected filters."
+            col1.info(no_data_message)
+            col2.info(no_data_message)
\ No newline at end of file
@@ -0,0 +1,141 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from developer_data import THEME_KEYWORDS
+from developer_index import get_post_index
+
+
+# Posts converted and written per chunk, bounds the memory an export needs
+EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", 20_000))
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+EXPORT_COLUMNS = [
+    "username", "full_name", "country", "followers", "following", "external_url",
+    "url", "upload_date", "number_of_likes", "number_of_comments", "video_view_count", "engagement",
+    "themes", "keywords",
+]
+
+
+def _iter_posts(filtered_data):
+    for account in filtered_data:
+        for post in account.get("posts", []):
+            yield account, post
+
+
+def iter_export_chunks(filtered_data, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Filtered posts as DataFrames of at most chunk_rows rows, in dataset order
+
+    Each row has the account fields, the parsed upload date, the engagement counts
+    and the themes and (lowercased) THEME_KEYWORDS terms the post matched, taken
+    from the post index. Themes and keywords are joined with "; ".
+    """
+    index, rows = get_post_index(filtered_data, THEME_KEYWORDS)
+    posts = _iter_posts(filtered_data)
+
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        columns = {
+            "username": [], "full_name": [], "country": [], "followers": [], "following": [], "external_url": [],
+            "url": [], "number_of_likes": [], "number_of_comments": [], "video_view_count": [],
+        }
+        for _, (account, post) in zip(chunk, posts):
+            columns["username"].append(account.get("username", ""))
+            columns["full_name"].append(account.get("full_name", ""))
+            columns["country"].append(account.get("country", ""))
+            columns["followers"].append(account.get("followers", 0) or 0)
+            columns["following"].append(account.get("following", 0) or 0)
+            columns["external_url"].append(account.get("external_url", ""))
+            columns["url"].append(post.get("url", ""))
+            columns["number_of_likes"].append(post.get("number_of_likes", 0) or 0)
+            columns["number_of_comments"].append(post.get("number_of_comments", 0) or 0)
+            columns["video_view_count"].append(post.get("video_view_count", 0) or 0)
+
+        df = pd.DataFrame(columns)
+        for column in ["followers", "following", "number_of_likes", "number_of_comments", "video_view_count"]:
+            df[column] = df[column].astype("int64")
+        # Dates were parsed when the data was indexed, NaT for missing or malformed ones
+        df["upload_date"] = index.upload_dates(chunk).to_numpy()
+        df["engagement"] = df["number_of_likes"] + df["number_of_comments"] + df["video_view_count"]
+        df["themes"] = _theme_names(index, chunk)
+        df["keywords"] = _keyword_names(index, chunk)
+        yield df[EXPORT_COLUMNS]
+
+
+def _theme_names(index, rows):
+    masks = index.theme_masks[rows]
+    return ["; ".join(theme for bit, theme in enumerate(index.theme_names) if mask & (1 << bit)) for mask in masks]
+
+
+def _keyword_names(index, rows):
+    # Entries of each row in the keyword matrix
+    indptr = index.keyword_indptr
+    indices = index.keyword_indices
+    return ["; ".join(index.keywords[keyword_id] for keyword_id in sorted(indices[indptr[row]:indptr[row + 1]])) for row in rows]
+
+
+def write_csv(filtered_data, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for number, chunk in enumerate(iter_export_chunks(filtered_data, chunk_rows)):
+            chunk.to_csv(f, header=number == 0, index=False, date_format="%Y-%m-%d")
+        if f.tell() == 0:
+            f.write(",".join(EXPORT_COLUMNS) + "\n")
+
+
+def write_parquet(filtered_data, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Only needed when someone exports to Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("username", pa.string()),
+        ("full_name", pa.string()),
+        ("country", pa.string()),
+        ("followers", pa.int64()),
+        ("following", pa.int64()),
+        ("external_url", pa.string()),
+        ("url", pa.string()),
+        ("upload_date", pa.timestamp("ns")),
+        ("number_of_likes", pa.int64()),
+        ("number_of_comments", pa.int64()),
+        ("video_view_count", pa.int64()),
+        ("engagement", pa.int64()),
+        ("themes", pa.string()),
+        ("keywords", pa.string()),
+    ])
+    # One row group per chunk
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_export_chunks(filtered_data, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def export_posts(filtered_data, export_format="CSV", directory=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write the filtered posts to a temporary file, one chunk at a time
+
+    Args:
+        filtered_data (list): Output of filter_data
+        export_format (str): Key of EXPORT_FORMATS
+        directory (str, optional): Directory of the file, the system temp directory by default
+
+    Returns:
+        str: Path of the file, the caller deletes it when it's no longer needed
+    """
+    extension, _ = EXPORT_FORMATS[export_format]
+    fd, path = tempfile.mkstemp(prefix="developer-posts-", suffix=f".{extension}", dir=directory)
+    os.close(fd)
+    try:
+        if export_format == "Parquet":
+            write_parquet(filtered_data, path, chunk_rows)
+        else:
+            write_csv(filtered_data, path, chunk_rows)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
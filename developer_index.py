@@ -0,0 +1,333 @@
+import threading
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from keyword_matcher import get_theme_matcher
+from language_detection import LANGUAGE_WORKERS, detect_languages
+from language_keywords import language_theme_masks
+from theme_classifier import classify_text_blobs
+
+
+EPOCH = date(1970, 1, 1)
+
+# Day ordinal of posts without a valid upload_date, sorts after every real date
+NO_DATE = np.iinfo(np.int32).max
+
+
+def to_day_ordinal(value):
+    """Days since 1970-01-01 of a date or datetime"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - EPOCH).days
+
+
+def from_day_ordinal(ordinal):
+    return EPOCH + timedelta(days=int(ordinal))
+
+
+def post_text_blob(post):
+    """Lowercased caption and hashtags, the text every keyword and theme check runs on"""
+    caption = (post.get("caption") or "").lower()
+    hashtags = [h.lower() for h in post.get("hashtags", [])]
+    return caption + " " + " ".join(hashtags)
+
+
+class PostIndex:
+    """
+    Per-post data computed once when a dataset is loaded, so filters and
+    aggregations don't have to look at the captions again.
+
+    Rows follow the order of the posts in the dataset. Any list built from the
+    same post dicts (e.g. the output of filter_data) can be mapped back to its
+    rows with rows_for().
+
+    theme_masks holds one bit per theme, in THEME_KEYWORDS order, and a last
+    bit for "Others" on posts that matched no theme. languages holds the detected
+    language of every caption; posts in a language with its own dictionary
+    (LANGUAGE_THEME_KEYWORDS, e.g. Arabic) are matched against it on top of THEME_KEYWORDS.
+
+    day_ordinals holds upload_date as days since 1970-01-01, parsed once. Posts
+    with a missing or malformed date get NO_DATE. date_order lists the rows sorted
+    by date, so a date range is a binary search and a contiguous slice of it.
+
+    The keyword index maps every (lowercased) THEME_KEYWORDS term to the sorted
+    rows of the posts containing it, so a keyword filter is a union of posting lists.
+    The same hits are kept as a sparse post x keyword matrix of occurrence counts in
+    CSR form: the entries of row r are keyword_indices / keyword_counts
+    [keyword_indptr[r]:keyword_indptr[r + 1]], keyword_entry_rows holds the row of
+    every entry so a subset of rows can be selected without a loop.
+    """
+
+    def __init__(self, data, theme_keywords, language_workers=LANGUAGE_WORKERS):
+        self.data = data
+        self.theme_names = list(theme_keywords) + ["Others"]
+        self.others_bit = 1 << (len(self.theme_names) - 1)
+
+        self.row_by_post = {}
+        self.text_blobs = []
+        captions = []
+        upload_dates = []
+        for account in data:
+            for post in account.get("posts", []):
+                self.row_by_post[id(post)] = len(self.text_blobs)
+                self.text_blobs.append(post_text_blob(post))
+                captions.append(post.get("caption") or "")
+                upload_dates.append(post.get("upload_date"))
+
+        self._index_dates(upload_dates)
+
+        # Large datasets are classified in chunks on a process pool
+        self.theme_masks, hit_rows, hit_keywords, hit_counts = classify_text_blobs(self.text_blobs, theme_keywords)
+
+        # Told by the script of the caption, the few captions langdetect has to decide are cached across loads and processes
+        self.languages = np.array(detect_languages(captions, workers=language_workers), dtype=object)
+        self.theme_masks |= language_theme_masks(self.text_blobs, self.languages, list(theme_keywords))
+        self.theme_masks[self.theme_masks == 0] = self.others_bit
+
+        self._index_keywords(get_theme_matcher(theme_keywords).automaton.keywords, hit_rows, hit_keywords, hit_counts)
+
+    def _index_dates(self, upload_dates):
+        parsed = pd.to_datetime(pd.Series(upload_dates, dtype="object"), format="%Y-%m-%d", errors="coerce")
+        valid = parsed.notna().to_numpy()
+
+        self.day_ordinals = np.full(len(upload_dates), NO_DATE, dtype=np.int32)
+        self.day_ordinals[valid] = parsed[valid].to_numpy().astype("datetime64[D]").astype(np.int64)
+
+        # Missing dates are expected, malformed ones point at a scraping problem
+        self.dated_posts = int(valid.sum())
+        self.missing_dates = sum(1 for upload_date in upload_dates if not upload_date)
+        self.malformed_dates = len(upload_dates) - self.dated_posts - self.missing_dates
+
+        self.date_order = np.argsort(self.day_ordinals, kind="stable")
+        self.sorted_days = self.day_ordinals[self.date_order]
+
+    def _index_keywords(self, keywords, hit_rows, hit_keywords, hit_counts):
+        self.keywords = keywords
+        self.keyword_ids = {keyword: keyword_id for keyword_id, keyword in enumerate(keywords)}
+
+        # The hits come ordered by row, which is already the CSR layout
+        self.keyword_indptr = np.zeros(len(self.text_blobs) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(hit_rows, minlength=len(self.text_blobs)), out=self.keyword_indptr[1:])
+        self.keyword_indices = hit_keywords
+        self.keyword_counts = hit_counts
+        self.keyword_entry_rows = hit_rows
+
+        # Posting lists stored back to back, keyword i owns posting_rows[posting_ptr[i]:posting_ptr[i + 1]]
+        order = np.lexsort((hit_rows, hit_keywords))
+        self.posting_rows = hit_rows[order]
+        self.posting_ptr = np.searchsorted(hit_keywords[order], np.arange(len(keywords) + 1))
+
+        # Keywords outside THEME_KEYWORDS are looked up once and remembered
+        self._extra_postings = LRUCache(maxsize=256)
+        self._extra_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.text_blobs)
+
+    def postings(self, keyword):
+        """Sorted rows of the posts whose caption or hashtags contain keyword (case insensitive)"""
+        keyword = keyword.lower()
+        keyword_id = self.keyword_ids.get(keyword)
+        if keyword_id is not None:
+            return self.posting_rows[self.posting_ptr[keyword_id]:self.posting_ptr[keyword_id + 1]]
+
+        with self._extra_lock:
+            rows = self._extra_postings.get(keyword)
+        if rows is None:
+            rows = np.array([row for row, text_blob in enumerate(self.text_blobs) if keyword in text_blob], dtype=np.int64)
+            with self._extra_lock:
+                self._extra_postings[keyword] = rows
+        return rows
+
+    def keyword_match(self, keywords):
+        """Boolean array over all rows, True for posts containing any of the keywords"""
+        match = np.zeros(len(self), dtype=bool)
+        for keyword in keywords:
+            match[self.postings(keyword)] = True
+        return match
+
+    def _row_entries(self, rows):
+        """Entries of the keyword matrix that belong to rows, and the position in rows of each"""
+        positions = np.full(len(self), -1, dtype=np.int64)
+        positions[rows] = np.arange(len(rows))
+        entry_positions = positions[self.keyword_entry_rows]
+        selected = entry_positions >= 0
+        return selected, entry_positions[selected]
+
+    def keyword_totals(self, rows):
+        """Occurrences of every keyword (column sums of the keyword matrix) over the given rows"""
+        selected, _ = self._row_entries(rows)
+        return np.bincount(
+            self.keyword_indices[selected],
+            weights=self.keyword_counts[selected],
+            minlength=len(self.keywords),
+        ).astype(np.int64)
+
+    def keyword_totals_by_group(self, rows, group_codes, n_groups):
+        """
+        keyword_totals for every group of rows in one pass
+
+        Args:
+            rows (ndarray): Rows to count
+            group_codes (ndarray): Group number (0 to n_groups - 1) of each row, -1 leaves the row out
+            n_groups (int): Number of groups
+
+        Returns:
+            ndarray: n_groups x keywords matrix of occurrence counts
+        """
+        selected, entry_positions = self._row_entries(rows)
+        entry_groups = np.asarray(group_codes, dtype=np.int64)[entry_positions]
+        grouped = entry_groups >= 0
+        cells = entry_groups[grouped] * len(self.keywords) + self.keyword_indices[selected][grouped]
+        totals = np.bincount(cells, weights=self.keyword_counts[selected][grouped], minlength=n_groups * len(self.keywords))
+        return totals.astype(np.int64).reshape(n_groups, len(self.keywords))
+
+    def date_report(self):
+        return {
+            "posts": len(self),
+            "dated": self.dated_posts,
+            "missing": self.missing_dates,
+            "malformed": self.malformed_dates,
+        }
+
+    def date_bounds(self, rows=None):
+        """
+        Earliest and latest upload date of the given rows, all rows when omitted
+
+        Returns:
+            tuple: (min_date, max_date) as datetime.date objects, or (None, None) if no valid dates
+        """
+        if rows is None:
+            # The sorted order makes this O(1)
+            if not self.dated_posts:
+                return None, None
+            return from_day_ordinal(self.sorted_days[0]), from_day_ordinal(self.sorted_days[self.dated_posts - 1])
+
+        days = self.day_ordinals[rows]
+        days = days[days != NO_DATE]
+        if not len(days):
+            return None, None
+        return from_day_ordinal(days.min()), from_day_ordinal(days.max())
+
+    def rows_in_date_range(self, start_date, end_date):
+        """Rows uploaded between start_date and end_date (inclusive), in date order"""
+        start = np.searchsorted(self.sorted_days, to_day_ordinal(start_date), side="left")
+        end = np.searchsorted(self.sorted_days, to_day_ordinal(end_date), side="right")
+        return self.date_order[start:end]
+
+    def date_range_match(self, start_date, end_date):
+        """Boolean array over all rows, True for posts uploaded in the date range"""
+        match = np.zeros(len(self), dtype=bool)
+        match[self.rows_in_date_range(start_date, end_date)] = True
+        return match
+
+    def upload_dates(self, rows):
+        """datetime64 upload dates of the given rows, NaT where the date is missing or malformed"""
+        days = self.day_ordinals[rows]
+        dates = days.astype("datetime64[D]")
+        dates[days == NO_DATE] = np.datetime64("NaT")
+        return pd.Series(dates.astype("datetime64[ns]"))
+
+    def rows_for(self, data):
+        """
+        Rows of the posts in data
+
+        Returns:
+            ndarray: Row numbers, or None if data has posts that are not in this index
+        """
+        rows = []
+        for account in data:
+            for post in account.get("posts", []):
+                row = self.row_by_post.get(id(post))
+                if row is None:
+                    return None
+                rows.append(row)
+        return np.array(rows, dtype=np.int64)
+
+    def theme_bits(self, themes):
+        """Bitmask selecting the given theme names, "Others" included"""
+        bits = 0
+        for theme in themes:
+            if theme in self.theme_names:
+                bits |= 1 << self.theme_names.index(theme)
+        return bits
+
+    def theme_match(self, themes):
+        """Boolean array over all rows, True for posts in any of the given themes"""
+        return (self.theme_masks & self.theme_bits(themes)) != 0
+
+    def theme_counts(self, masks):
+        """Number of posts per theme for an array of theme masks, themes without posts are left out"""
+        counts = {}
+        for bit, theme in enumerate(self.theme_names):
+            count = int(np.count_nonzero(masks & (1 << bit)))
+            if count:
+                counts[theme] = count
+        return counts
+
+
+def first_theme_masks(masks):
+    """Keep only the lowest set bit, i.e. the first matching theme of each post"""
+    return masks & -masks
+
+
+# Indexes of the loaded datasets, newest last. Only a couple are kept, an index
+# keeps its dataset alive and a reload replaces the previous one.
+_index_lock = threading.Lock()
+_indexes = []
+MAX_INDEXES = 2
+
+
+def index_dataset(data, theme_keywords):
+    """Build and register the index of a freshly loaded dataset"""
+    index = PostIndex(data, theme_keywords)
+    with _index_lock:
+        _indexes.append(index)
+        del _indexes[:-MAX_INDEXES]
+
+    report = index.date_report()
+    print(f"Indexed {report['posts']} posts: {report['missing']} without upload date, {report['malformed']} with a malformed upload date")
+    return index
+
+
+def find_post_index(data):
+    """
+    Index of a loaded dataset covering the posts in data, without building one
+
+    Returns:
+        tuple: (PostIndex, rows), or (None, None) if data is not part of a loaded dataset
+    """
+    with _index_lock:
+        indexes = list(reversed(_indexes))
+
+    for index in indexes:
+        if index.data is data:
+            return index, np.arange(len(index), dtype=np.int64)
+        rows = index.rows_for(data)
+        if rows is not None:
+            return index, rows
+
+    return None, None
+
+
+def get_post_index(data, theme_keywords):
+    """
+    Index covering the posts in data, together with their rows
+
+    Uses the index of a loaded dataset when data is that dataset or a subset of
+    it, otherwise builds a throwaway index over data.
+
+    Returns:
+        tuple: (PostIndex, rows)
+    """
+    index, rows = find_post_index(data)
+    if index is not None:
+        return index, rows
+
+    # Languages detected before come from the language cache, the few new captions of
+    # a throwaway index are not worth starting a process pool for
+    index = PostIndex(data, theme_keywords, language_workers=1)
+    return index, np.arange(len(index), dtype=np.int64)
@@ -0,0 +1,102 @@
+import time
+from contextlib import contextmanager
+
+from developer_data import (
+    THEME_KEYWORDS,
+    build_post_frame,
+    get_engagement_trend_data,
+    get_estimated_reach,
+    get_post_trend_data,
+    get_total_countries,
+    get_total_engagements,
+    theme_distribution_for_rows,
+    theme_distribution_over_time_for_rows,
+    top_keywords_for_rows,
+)
+from developer_index import get_post_index
+from developer_table import AccountsTable
+
+
+class DashboardSnapshot:
+    """
+    Everything the developer dashboard shows for one filter state, computed once.
+
+    The filtered accounts are walked once to build the post frame and once to look
+    up their rows in the post index, every figure below is derived from those two.
+    When the cube of the dataset is given, the tiles, trends and theme over time
+    come from a roll-up of the cube instead, unless a keyword filter is applied.
+    The time spent on each section is kept in `timings` (seconds).
+
+    Args:
+        filtered_data (list): Output of filter_data
+        top_keywords (int): Number of top keywords
+        fuzzy_threshold (int): Fuzzy threshold of the theme distribution
+        cube (DeveloperCube, optional): Cube of the dataset filtered_data was filtered from
+        spec (FilterSpec, optional): Filters that produced filtered_data, required with cube
+    """
+
+    def __init__(self, filtered_data, top_keywords=15, fuzzy_threshold=80, cube=None, spec=None):
+        self.timings = {}
+
+        with self.timed("posts"):
+            self.posts = build_post_frame(filtered_data)
+            self.index, self.rows = get_post_index(filtered_data, THEME_KEYWORDS)
+
+        rollup = None
+        if cube is not None and spec is not None and not spec.keywords:
+            with self.timed("rollup"):
+                rollup = cube.rollup(spec.themes, spec.accounts, spec.date_range, spec.countries)
+
+        with self.timed("kpis"):
+            if rollup is not None:
+                self.total_accounts = rollup.total_accounts
+                self.total_countries = rollup.total_countries
+                self.total_posts = rollup.total_posts
+                self.total_engagements = rollup.total_engagements
+                self.estimated_reach = rollup.estimated_reach
+            else:
+                self.total_accounts = len(filtered_data)
+                self.total_countries = get_total_countries(filtered_data)
+                self.total_posts = len(self.posts)
+                self.total_engagements = get_total_engagements(self.posts)
+                self.estimated_reach = get_estimated_reach(self.posts)
+            self.avg_engagement = round(self.total_engagements / self.total_posts) if self.total_posts else 0
+
+        with self.timed("accounts"):
+            # Paged on demand, see AccountsTable.page
+            self.accounts = AccountsTable(self.posts)
+
+        with self.timed("trends"):
+            if rollup is not None:
+                self.post_trend = rollup.post_trend
+                self.engagement_trend = rollup.engagement_trend
+            else:
+                self.post_trend = get_post_trend_data(self.posts)
+                self.engagement_trend = get_engagement_trend_data(self.posts)
+
+        with self.timed("theme_over_time"):
+            if rollup is not None:
+                self.theme_distribution_over_time = rollup.theme_distribution_over_time
+            else:
+                self.theme_distribution_over_time = theme_distribution_over_time_for_rows(self.index, self.rows, self.posts["upload_date"])
+
+        with self.timed("top_keywords"):
+            self.top_keywords = top_keywords_for_rows(self.index, self.rows, top_keywords)
+
+        with self.timed("theme_distribution"):
+            self.theme_distribution = theme_distribution_for_rows(self.index, self.rows, allow_multiple_themes=True, fuzzy_threshold=fuzzy_threshold)
+
+    @contextmanager
+    def timed(self, section):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[section] = time.perf_counter() - start
+
+    @property
+    def total_time(self):
+        return sum(self.timings.values())
+
+    def timings_summary(self):
+        return ", ".join(f"{section}={seconds * 1000:.0f}ms" for section, seconds in self.timings.items())
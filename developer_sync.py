@@ -0,0 +1,277 @@
+import json
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from developer_data import ACCOUNT_FIELDS, POST_FIELDS
+
+
+# ------------------------------
+# Local snapshot of the developer collection
+# ------------------------------
+#
+# The snapshot keeps two Parquet files, one row per account and one row per post,
+# plus a small state file with the upload_date watermark of the last sync. A sync
+# only downloads the account level fields (followers etc.) and the posts uploaded
+# on or after the watermark, everything older is read from disk.
+#
+# Posts without a well formed upload_date (missing, malformed or not zero padded)
+# can't be placed against the watermark. They are downloaded again on every sync
+# and matched against the snapshot by post key, so those added since the last
+# sync are picked up too. A post downloaded again replaces its row in the snapshot,
+# which keeps the likes, comments and views of recent posts current.
+#
+# Posts deleted upstream, and posts added upstream with a well formed upload_date
+# before the watermark, only show up in the snapshot after a full resync.
+
+ACCOUNTS_FILE = "accounts.parquet"
+POSTS_FILE = "posts.parquet"
+STATE_FILE = "state.json"
+
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+ACCOUNT_SCHEMA = pa.schema([
+    ("_id", pa.string()),
+    ("username", pa.string()),
+    ("full_name", pa.string()),
+    ("followers", pa.int64()),
+    ("following", pa.int64()),
+    ("country", pa.string()),
+    ("external_url", pa.string()),
+])
+
+POST_SCHEMA = pa.schema([
+    ("account_id", pa.string()),
+    ("post_key", pa.string()),
+    ("caption", pa.string()),
+    ("hashtags", pa.list_(pa.string())),
+    ("upload_date", pa.string()),
+    ("number_of_likes", pa.int64()),
+    ("number_of_comments", pa.int64()),
+    ("video_view_count", pa.int64()),
+    ("url", pa.string()),
+])
+
+INT_FIELDS = {"followers", "following", "number_of_likes", "number_of_comments", "video_view_count"}
+
+
+def _to_int(value):
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_str(value):
+    return str(value) if value is not None else None
+
+
+def _post_key(post):
+    # Posts have no id of their own, the url identifies them when it is present
+    url = post.get("url")
+    if url:
+        return url
+    return f"{post.get('upload_date')}|{post.get('caption')}"
+
+
+def _account_row(doc):
+    row = {"_id": str(doc["_id"])}
+    for field in ACCOUNT_FIELDS:
+        value = doc.get(field)
+        row[field] = _to_int(value) if field in INT_FIELDS else _to_str(value)
+    return row
+
+
+def _post_row(account_id, post):
+    row = {"account_id": account_id, "post_key": _post_key(post)}
+    for field in POST_FIELDS:
+        value = post.get(field)
+        if field == "hashtags":
+            row[field] = [str(tag) for tag in (value or [])]
+        elif field in INT_FIELDS:
+            row[field] = _to_int(value)
+        else:
+            row[field] = _to_str(value)
+    return row
+
+
+def _posts_pipeline(account_ids, since=None):
+    """
+    Pipeline returning one document per post of the given accounts, {_id: account id, posts: post}
+
+    With `since`, only the posts uploaded on or after it and the posts without a well
+    formed upload_date. Query operators only, $regex never matches a value that isn't
+    a string and $gte on a string only compares with strings.
+    """
+    pipeline = [
+        {"$match": {"_id": {"$in": list(account_ids)}}},
+        {"$unwind": "$posts"},
+    ]
+    if since:
+        pipeline.append({"$match": {"$or": [
+            {"posts.upload_date": {"$gte": since, "$regex": DATE_PATTERN}},
+            {"posts.upload_date": {"$not": re.compile(DATE_PATTERN)}},
+        ]}})
+    pipeline.append({"$project": {f"posts.{field}": 1 for field in POST_FIELDS}})
+    return pipeline
+
+
+def _read_state(snapshot_dir):
+    path = os.path.join(snapshot_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+@contextmanager
+def _replace_file(path, mode="wb"):
+    """
+    Open a temporary file next to path, swapped in for it when the block succeeds,
+    so a crash never leaves a half written snapshot
+    """
+    f = tempfile.NamedTemporaryFile(mode, dir=os.path.dirname(path) or None, prefix=os.path.basename(path) + ".", suffix=".tmp", delete=False)
+    try:
+        with f:
+            yield f
+        os.replace(f.name, path)
+    except BaseException:
+        os.remove(f.name)
+        raise
+
+
+def _write_table(table, path):
+    with _replace_file(path) as f:
+        pq.write_table(table, f)
+
+
+def read_snapshot(snapshot_dir):
+    """
+    Read the local snapshot
+
+    Returns:
+        tuple: (accounts_table, posts_table, state), tables are None if there is no snapshot yet
+    """
+    accounts_path = os.path.join(snapshot_dir, ACCOUNTS_FILE)
+    posts_path = os.path.join(snapshot_dir, POSTS_FILE)
+    if not (os.path.exists(accounts_path) and os.path.exists(posts_path)):
+        return None, None, {}
+
+    accounts_table = pq.read_table(accounts_path, schema=ACCOUNT_SCHEMA)
+    posts_table = pq.read_table(posts_path, schema=POST_SCHEMA)
+    return accounts_table, posts_table, _read_state(snapshot_dir)
+
+
+def snapshot_to_data(accounts_table, posts_table):
+    """Rebuild the nested account/posts documents returned by get_data"""
+    # Nulls are dropped so missing fields read the same as in the original documents
+    posts_by_account = {}
+    for post in posts_table.to_pylist():
+        account_id = post.pop("account_id")
+        post.pop("post_key")
+        posts_by_account.setdefault(account_id, []).append({k: v for k, v in post.items() if v is not None})
+
+    data = []
+    for account in accounts_table.to_pylist():
+        account = {k: v for k, v in account.items() if v is not None}
+        account["posts"] = posts_by_account.get(account["_id"], [])
+        data.append(account)
+    return data
+
+
+def sync_snapshot(collection, snapshot_dir, full=False):
+    """
+    Bring the local snapshot up to date and return its contents
+
+    Args:
+        collection: The realestate-developers collection
+        snapshot_dir (str): Directory holding the snapshot files
+        full (bool): Ignore the local snapshot and download everything again
+
+    Returns:
+        list: List of account data, same shape as get_data
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    accounts_table, posts_table, state = (None, None, {}) if full else read_snapshot(snapshot_dir)
+    watermark = state.get("watermark")
+
+    # Account level fields are small, always take the current version
+    account_docs = list(collection.find({}, {field: 1 for field in ACCOUNT_FIELDS}))
+    ids_by_key = {str(doc["_id"]): doc["_id"] for doc in account_docs}
+
+    known_ids = set(accounts_table.column("_id").to_pylist()) if accounts_table is not None else set()
+    new_ids = [ids_by_key[key] for key in ids_by_key if key not in known_ids]
+    existing_ids = [ids_by_key[key] for key in ids_by_key if key in known_ids]
+
+    since = watermark or "0000-00-00"
+    delta_rows = []
+    if new_ids:
+        for doc in collection.aggregate(_posts_pipeline(new_ids)):
+            delta_rows.append(_post_row(str(doc["_id"]), doc["posts"]))
+    if existing_ids:
+        for doc in collection.aggregate(_posts_pipeline(existing_ids, since=since)):
+            delta_rows.append(_post_row(str(doc["_id"]), doc["posts"]))
+
+    delta_table = pa.Table.from_pylist(delta_rows, schema=POST_SCHEMA)
+
+    new_posts = delta_table.num_rows
+    if posts_table is not None:
+        # Drop accounts that no longer exist
+        posts_table = posts_table.filter(pc.is_in(posts_table.column("account_id"), value_set=pa.array(list(ids_by_key), pa.string())))
+
+        # The delta overlaps the snapshot on the watermark day and in the posts without
+        # a well formed date. It has their current engagement counts, so a post we
+        # already have is replaced in place by its downloaded row, the others are added.
+        rows = list(range(posts_table.num_rows))
+        new_rows = []
+        if delta_table.num_rows:
+            upload_dates = posts_table.column("upload_date")
+            settled = pc.and_(pc.match_substring_regex(upload_dates, DATE_PATTERN), pc.less(upload_dates, since))
+            recent_rows = {}
+            for row, (account_id, key, is_settled) in enumerate(zip(
+                posts_table.column("account_id").to_pylist(), posts_table.column("post_key").to_pylist(), pc.fill_null(settled, False).to_pylist()
+            )):
+                if not is_settled:
+                    recent_rows.setdefault((account_id, key), []).append(row)
+
+            # Posts sharing a key are paired up in order
+            for delta_row, post in enumerate(zip(delta_table.column("account_id").to_pylist(), delta_table.column("post_key").to_pylist())):
+                matches = recent_rows.get(post)
+                if matches:
+                    rows[matches.pop(0)] = posts_table.num_rows + delta_row
+                else:
+                    new_rows.append(posts_table.num_rows + delta_row)
+
+        new_posts = len(new_rows)
+        posts_table = pa.concat_tables([posts_table, delta_table]).take(pa.array(rows + new_rows, pa.int64()))
+    else:
+        posts_table = delta_table
+
+    accounts_table = pa.Table.from_pylist([_account_row(doc) for doc in account_docs], schema=ACCOUNT_SCHEMA)
+
+    _write_table(accounts_table, os.path.join(snapshot_dir, ACCOUNTS_FILE))
+    _write_table(posts_table, os.path.join(snapshot_dir, POSTS_FILE))
+
+    # Only well formed dates move the watermark
+    dates = posts_table.filter(pc.match_substring_regex(posts_table.column("upload_date"), DATE_PATTERN)).column("upload_date")
+    new_state = {
+        "watermark": pc.max(dates).as_py() if len(dates) else watermark,
+        "synced_at": datetime.now().isoformat(timespec="seconds"),
+        "accounts": accounts_table.num_rows,
+        "posts": posts_table.num_rows,
+        "delta_posts": new_posts,
+        "updated_posts": delta_table.num_rows - new_posts,
+    }
+    with _replace_file(os.path.join(snapshot_dir, STATE_FILE), "w") as f:
+        json.dump(new_state, f, indent=2)
+
+    print(f"Snapshot synced: {new_posts} new posts, {delta_table.num_rows - new_posts} updated, {posts_table.num_rows} total")
+
+    return snapshot_to_data(accounts_table, posts_table)
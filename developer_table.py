@@ -0,0 +1,148 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+
+# Columns of the accounts table, in display order
+TABLE_COLUMNS = ["User Name", "Full Name", "Followers", "Following", "Countries", "Post URL", "Profile URL", "External URL"]
+
+# Table column -> column of the accounts frame, the Post URL is the only post level column
+ACCOUNT_COLUMNS = {
+    "User Name": "username",
+    "Full Name": "full_name",
+    "Followers": "followers",
+    "Following": "following",
+    "Countries": "country",
+    "Profile URL": "username",
+    "External URL": "external_url",
+}
+
+# Columns the search looks at
+SEARCH_COLUMNS = ["username", "full_name", "country", "external_url"]
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+class AccountsTable:
+    """
+    One row per post with the attributes of its account, the table get_accounts()
+    returns, kept lean and materialized one page at a time.
+
+    Account attributes are stored once per account and joined to the posts by
+    account key when a page is built. Sort orders and search results are computed
+    on the server and cached, only the rows of the requested page become a DataFrame.
+
+    Args:
+        posts (DataFrame): Post frame from build_post_frame
+    """
+
+    def __init__(self, posts):
+        account_keys = posts["account"].to_numpy()
+        # First post of every account carries its attributes
+        keys, first_rows, self.post_accounts = np.unique(account_keys, return_index=True, return_inverse=True)
+        self.accounts = posts[["username", "full_name", "followers", "following", "country", "external_url"]].iloc[first_rows].reset_index(drop=True)
+        for column in ["username", "full_name", "country", "external_url"]:
+            self.accounts[column] = self.accounts[column].cat.remove_unused_categories()
+        self.urls = posts["url"].to_numpy()
+
+        self._lock = threading.Lock()
+        self._orders = {}
+        self._searches = LRUCache(maxsize=16)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def _order(self, sort_by, ascending):
+        """Post rows in sort order, posts of one account keep their dataset order"""
+        key = (sort_by, ascending)
+        with self._lock:
+            order = self._orders.get(key)
+        if order is not None:
+            return order
+
+        if sort_by is None:
+            order = np.arange(len(self))
+        elif sort_by == "Post URL":
+            order = pd.Series(self.urls, dtype="object").sort_values(ascending=ascending, kind="stable").index.to_numpy()
+        else:
+            column = self.accounts[ACCOUNT_COLUMNS[sort_by]]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype("object")
+            # Rank the accounts, then order the posts by the rank of their account
+            account_order = column.sort_values(ascending=ascending, kind="stable").index.to_numpy()
+            account_rank = np.empty(len(account_order), dtype=np.int64)
+            account_rank[account_order] = np.arange(len(account_order))
+            order = np.argsort(account_rank[self.post_accounts], kind="stable")
+
+        with self._lock:
+            self._orders[key] = order
+        return order
+
+    def _search(self, search):
+        """Boolean array over the posts matching a case insensitive search, None when not searching"""
+        search = (search or "").strip().lower()
+        if not search:
+            return None
+
+        with self._lock:
+            match = self._searches.get(search)
+        if match is not None:
+            return match
+
+        # Account attributes are searched once per account, not once per post
+        account_match = np.zeros(len(self.accounts), dtype=bool)
+        for column in SEARCH_COLUMNS:
+            values = self.accounts[column].astype("object").fillna("").astype(str).str.lower()
+            account_match |= values.str.contains(search, regex=False).to_numpy()
+        match = account_match[self.post_accounts]
+        match |= pd.Series(self.urls, dtype="object").fillna("").astype(str).str.lower().str.contains(search, regex=False).to_numpy()
+
+        with self._lock:
+            self._searches[search] = match
+        return match
+
+    def rows(self, search=None, sort_by=None, ascending=True):
+        """Post rows matching the search, in sort order"""
+        order = self._order(sort_by, ascending)
+        match = self._search(search)
+        if match is None:
+            return order
+        return order[match[order]]
+
+    def count(self, search=None):
+        match = self._search(search)
+        return len(self) if match is None else int(np.count_nonzero(match))
+
+    def page(self, page=1, page_size=PAGE_SIZES[1], search=None, sort_by=None, ascending=True):
+        """
+        One page of the table
+
+        Args:
+            page (int): Page number, starting at 1
+            page_size (int): Rows per page
+            search (str, optional): Case insensitive text to look for in the account fields and post URL
+            sort_by (str, optional): Column of TABLE_COLUMNS to sort on, None keeps the dataset order
+            ascending (bool): Sort direction
+
+        Returns:
+            tuple: (DataFrame with the TABLE_COLUMNS of the page's rows indexed from the
+            row's position in the whole result starting at 1, total number of rows)
+        """
+        rows = self.rows(search, sort_by, ascending)
+        start = (max(page, 1) - 1) * page_size
+        page_rows = rows[start:start + page_size]
+
+        accounts = self.accounts.take(self.post_accounts[page_rows])
+        df = pd.DataFrame({
+            "User Name": accounts["username"].to_numpy(),
+            "Full Name": accounts["full_name"].to_numpy(),
+            "Followers": accounts["followers"].to_numpy(),
+            "Following": accounts["following"].to_numpy(),
+            "Countries": accounts["country"].to_numpy(),
+            "Post URL": self.urls[page_rows],
+            "Profile URL": "https://www.instagram.com/" + accounts["username"].astype(str).to_numpy(),
+            "External URL": accounts["external_url"].to_numpy(),
+        }, index=range(start + 1, start + len(page_rows) + 1))
+        return df, len(rows)
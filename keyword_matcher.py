@@ -0,0 +1,215 @@
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton that finds every occurrence of a set of keywords in one
+    pass over the text, instead of one substring search per keyword.
+
+    Matching is case sensitive and follows the `keyword in text` / `text.count(keyword)`
+    semantics, callers lowercase the keywords and the text when they need to.
+    """
+
+    def __init__(self, keywords):
+        # Duplicates are matched once, ids refer to positions in self.keywords
+        self.keywords = list(dict.fromkeys(keywords))
+        self.lengths = [len(keyword) for keyword in self.keywords]
+        self._empty_ids = [i for i, keyword in enumerate(self.keywords) if not keyword]
+
+        goto = [{}]
+        outputs = [[]]
+        for keyword_id, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(keyword_id)
+
+        # Breadth first over the trie to set failure links and merge their outputs
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+        # Fold the failure links into a full transition table, so matching is a
+        # single dict lookup per character. Characters outside it go back to the root.
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions = dict(delta[fail[state]])
+            transitions.update(goto[state])
+            delta[state] = transitions
+            queue.extend(goto[state].values())
+
+        self._delta = delta
+        self._outputs = [tuple(output) for output in outputs]
+
+    def find(self, text):
+        """Ids of the keywords that occur in text"""
+        found = set(self._empty_ids)
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def find_keywords(self, text):
+        """Keywords that occur in text"""
+        return {self.keywords[keyword_id] for keyword_id in self.find(text)}
+
+    def count(self, text):
+        """
+        Number of non-overlapping occurrences of each keyword, the same as text.count(keyword)
+
+        Returns:
+            dict: keyword id -> count, keywords that do not occur are left out
+        """
+        counts = {keyword_id: len(text) + 1 for keyword_id in self._empty_ids}
+        # Occurrences of one keyword are reported in order, so taking every
+        # occurrence that starts after the previous one ended is the str.count rule
+        next_start = {}
+        delta = self._delta
+        outputs = self._outputs
+        lengths = self.lengths
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = delta[state].get(char, 0)
+            for keyword_id in outputs[state]:
+                start = end - lengths[keyword_id]
+                if start >= next_start.get(keyword_id, 0):
+                    counts[keyword_id] = counts.get(keyword_id, 0) + 1
+                    next_start[keyword_id] = end
+        return counts
+
+
+@lru_cache(maxsize=16)
+def _compile(keywords):
+    return KeywordAutomaton(keywords)
+
+
+def get_automaton(keywords):
+    """Automaton for a keyword list, compiled once and reused for the same keywords"""
+    return _compile(tuple(keywords))
+
+
+class ThemeMatcher:
+    """
+    Finds which themes of a {theme: [keywords]} dictionary have a keyword in a text
+    blob. Keywords are lowercased, the text blob is expected to be lowercase already.
+    """
+
+    def __init__(self, theme_keywords):
+        self.themes = list(theme_keywords)
+        self.automaton = KeywordAutomaton([keyword.lower() for keywords in theme_keywords.values() for keyword in keywords])
+
+        keyword_ids = {keyword: keyword_id for keyword_id, keyword in enumerate(self.automaton.keywords)}
+        self.keyword_themes = [set() for _ in self.automaton.keywords]
+        for theme_index, keywords in enumerate(theme_keywords.values()):
+            for keyword in keywords:
+                self.keyword_themes[keyword_ids[keyword.lower()]].add(theme_index)
+
+        # Bitmask of the themes each keyword belongs to, bit i for theme i
+        self.keyword_masks = [sum(1 << theme_index for theme_index in themes) for themes in self.keyword_themes]
+
+        # Keyword ids of each theme, shortest first: short keywords are the cheapest to
+        # score and reach a fuzzy threshold most often, see fuzzy_match_masks
+        self.theme_keyword_ids = [
+            sorted((keyword_id for keyword_id, themes in enumerate(self.keyword_themes) if theme_index in themes), key=self.automaton.lengths.__getitem__)
+            for theme_index in range(len(self.themes))
+        ]
+
+    def match_indexes(self, text_blob):
+        """Positions of the matched themes, in dictionary order"""
+        theme_indexes = set()
+        for keyword_id in self.automaton.find(text_blob):
+            theme_indexes.update(self.keyword_themes[keyword_id])
+        return sorted(theme_indexes)
+
+    def match(self, text_blob):
+        """Matched themes, in dictionary order"""
+        return [self.themes[theme_index] for theme_index in self.match_indexes(text_blob)]
+
+    def fuzzy_match_masks(self, text_blobs, threshold, min_keyword_length=4, workers=-1, chunk_size=20_000, keyword_batch=8, first_only=False):
+        """
+        Fuzzy theme matching of many text blobs at once
+
+        Scores keywords against blobs with fuzz.partial_ratio, a few keywords of a theme
+        at a time as one score matrix computed by rapidfuzz on `workers` threads. A
+        blob that reached the threshold for a theme is not scored against the rest of
+        its keywords, and identical blobs are scored once.
+
+        Args:
+            text_blobs (list): Lowercased text blobs
+            threshold (float): Minimum partial_ratio for a keyword to count as matched
+            min_keyword_length (int): Shorter keywords are not fuzzy matched
+            workers (int): Threads used by rapidfuzz, -1 uses all cores
+            chunk_size (int): Blobs scored per matrix, bounds the memory of one matrix
+            keyword_batch (int): Keywords scored per matrix
+            first_only (bool): Only find the first matching theme of each blob, the
+                themes after it are not scored
+
+        Returns:
+            ndarray: One int64 bitmask per blob with bit i set for matched theme i
+        """
+        blob_ids = {}
+        inverse = np.array([blob_ids.setdefault(text_blob, len(blob_ids)) for text_blob in text_blobs], dtype=np.int64)
+        blobs = list(blob_ids)
+
+        masks = np.zeros(len(blobs), dtype=np.int64)
+        # Scores go up to 100, nothing reaches a higher threshold
+        if not blobs or threshold > 100:
+            return masks[inverse]
+
+        for theme_index, keyword_ids in enumerate(self.theme_keyword_ids):
+            keywords = [self.automaton.keywords[i] for i in keyword_ids if self.automaton.lengths[i] >= min_keyword_length]
+            # Blobs not matched to this theme yet, or to any theme with first_only
+            pending = np.flatnonzero(masks == 0) if first_only else np.arange(len(blobs))
+
+            for start in range(0, len(keywords), keyword_batch):
+                if not len(pending):
+                    break
+                batch = keywords[start:start + keyword_batch]
+                hit = np.zeros(len(pending), dtype=bool)
+                for chunk_start in range(0, len(pending), chunk_size):
+                    chunk = pending[chunk_start:chunk_start + chunk_size]
+                    # keywords x blobs, scores below the threshold come back as 0
+                    # rapidfuzz only takes cutoffs of 0 to 100, every score passes a negative threshold
+                    scores = process.cdist(batch, [blobs[i] for i in chunk], scorer=fuzz.partial_ratio, score_cutoff=max(threshold, 0), workers=workers)
+                    hit[chunk_start:chunk_start + len(chunk)] = (scores >= threshold).any(axis=0)
+                masks[pending[hit]] |= 1 << theme_index
+                pending = pending[~hit]
+
+        return masks[inverse]
+
+
+@lru_cache(maxsize=16)
+def _compile_themes(theme_items):
+    return ThemeMatcher({theme: list(keywords) for theme, keywords in theme_items})
+
+
+def get_theme_matcher(theme_keywords):
+    """Theme matcher for a keyword dictionary, compiled once and reused for the same dictionary"""
+    return _compile_themes(tuple((theme, tuple(keywords)) for theme, keywords in theme_keywords.items()))
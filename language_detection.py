@@ -0,0 +1,282 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+
+from cachetools import LRUCache
+
+
+# SQLite file remembering the language of every caption seen, by caption hash. Shared
+# by every worker process and kept across restarts, empty keeps the cache in memory only.
+LANGUAGE_CACHE_PATH = os.environ.get("LANGUAGE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "developer-languages.sqlite"))
+
+# Captions whose language is also kept in process, in front of the SQLite file
+LANGUAGE_MEMORY_CACHE = int(os.environ.get("LANGUAGE_MEMORY_CACHE", 500_000))
+
+# Detection takes milliseconds per caption, so the pool pays off much earlier than for classification
+MIN_PARALLEL_CAPTIONS = int(os.environ.get("LANGUAGE_MIN_PARALLEL_CAPTIONS", 2_000))
+LANGUAGE_CHUNK_SIZE = int(os.environ.get("LANGUAGE_CHUNK_SIZE", 500))
+LANGUAGE_WORKERS = int(os.environ.get("LANGUAGE_WORKERS", os.cpu_count() or 1))
+
+# Cached languages of another detector version are detected again
+DETECTOR_VERSION = "script+langdetect-1"
+
+# Captions without Arabic script. Only languages with a theme dictionary of their own
+# (language_keywords.LANGUAGE_THEME_KEYWORDS) need telling apart, they are all written
+# in the Arabic script, so other captions are not detected at all.
+UNDETERMINED = "und"
+
+# Languages written in the Arabic script that langdetect tells apart
+ARABIC_SCRIPT_LANGUAGES = ("ar", "fa", "ur")
+
+_NOISE = re.compile(r"https?://\S+|www\.\S+|@\w+|[#_]")
+_ARABIC_WORDS = re.compile(r"[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]{2,}")
+# Letters of the Persian and Urdu alphabets that Arabic does not use
+_PERSIAN_URDU_LETTERS = re.compile(r"[\u067E\u0686\u0698\u06AF\u06A9\u06CC\u0679\u0688\u0691\u06BA\u06BE\u06C1\u06D2\u06D3]")
+
+
+def caption_hash(caption):
+    """Key of a caption in the language cache"""
+    return hashlib.blake2b(caption.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _arabic_script_text(caption):
+    """Words of a caption written in the Arabic script, without links, mentions and hashtag signs"""
+    text = _NOISE.sub(" ", caption or "")
+    return " ".join(word for word in _ARABIC_WORDS.findall(text) if any(char.isalpha() for char in word))
+
+
+def script_language(caption):
+    """
+    Language told by the script of a caption alone
+
+    Returns:
+        str: UNDETERMINED without Arabic script words, "ar" when they only use letters
+        of the Arabic alphabet, None when they also use Persian or Urdu letters and
+        langdetect has to decide
+    """
+    text = _arabic_script_text(caption)
+    if not text:
+        return UNDETERMINED
+    if _PERSIAN_URDU_LETTERS.search(text) is None:
+        return "ar"
+    return None
+
+
+_factory_lock = threading.Lock()
+_factory = {"detector_factory": None, "loaded": False}
+
+
+def _detector_factory():
+    """
+    langdetect factory with the profiles of the Arabic script languages only, loaded
+    once per process. None when langdetect is not installed.
+    """
+    with _factory_lock:
+        if not _factory["loaded"]:
+            _factory["loaded"] = True
+            try:
+                from langdetect import DetectorFactory
+                from langdetect.detector_factory import PROFILES_DIRECTORY
+            except ImportError:
+                print("langdetect is not installed, captions with Persian or Urdu letters are taken as Arabic")
+                return None
+            profiles = []
+            for language in ARABIC_SCRIPT_LANGUAGES:
+                with open(os.path.join(PROFILES_DIRECTORY, language), encoding="utf-8") as f:
+                    profiles.append(f.read())
+            factory = DetectorFactory()
+            factory.load_json_profile(profiles)
+            # langdetect samples the text at random, a fixed seed makes it deterministic
+            factory.set_seed(0)
+            _factory["detector_factory"] = factory
+        return _factory["detector_factory"]
+
+
+def _langdetect(text):
+    """Which of ARABIC_SCRIPT_LANGUAGES langdetect finds for text, None when langdetect is missing or finds nothing"""
+    factory = _detector_factory()
+    if factory is None:
+        return None
+    from langdetect.lang_detect_exception import LangDetectException
+    try:
+        detector = factory.create()
+        detector.append(text)
+        return detector.detect()
+    except LangDetectException:
+        return None
+
+
+def detect_language(caption):
+    """
+    Language of a caption, fully offline
+
+    Only the Arabic script is looked at: Gulf and Egyptian posts mix Arabic text
+    with English hashtags and place names. Text in the Arabic alphabet is Arabic,
+    text with Persian or Urdu letters goes to langdetect, which only compares it
+    with the Arabic script languages.
+
+    Returns:
+        str: "ar", "fa" or "ur", UNDETERMINED when the caption has no Arabic script
+    """
+    language = script_language(caption)
+    if language is not None:
+        return language
+    language = _langdetect(_arabic_script_text(caption))
+    return language if language in ARABIC_SCRIPT_LANGUAGES else "ar"
+
+
+def detect_chunk(captions):
+    return [detect_language(caption) for caption in captions]
+
+
+class LanguageCache:
+    """
+    Language of captions by caption hash, in memory and in a SQLite file
+
+    SQLite handles several processes reading and writing the same file, so new
+    worker processes start with every language detected before.
+    """
+
+    def __init__(self, path=LANGUAGE_CACHE_PATH, memory_size=LANGUAGE_MEMORY_CACHE):
+        self.path = path
+        self._memory = LRUCache(maxsize=memory_size)
+        self._lock = threading.Lock()
+        if self.path:
+            try:
+                with self._connect() as connection:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute("CREATE TABLE IF NOT EXISTS languages (hash BLOB PRIMARY KEY, language TEXT NOT NULL, detector TEXT NOT NULL)")
+            except (OSError, sqlite3.Error) as error:
+                print(f"Language cache {self.path} is not usable, keeping languages in memory only: {error}")
+                self.path = ""
+
+    @contextmanager
+    def _connect(self):
+        """Connection in a transaction, committed and closed on exit"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            with connection:
+                yield connection
+
+    def get_many(self, hashes):
+        """Known languages of the given caption hashes, as a {hash: language} dict"""
+        found = {}
+        missing = []
+        with self._lock:
+            for caption_key in hashes:
+                language = self._memory.get(caption_key)
+                if language is None:
+                    missing.append(caption_key)
+                else:
+                    found[caption_key] = language
+        if not missing or not self.path:
+            return found
+
+        stored = {}
+        with self._connect() as connection:
+            # Well below SQLite's limit on query parameters
+            for start in range(0, len(missing), 500):
+                batch = missing[start:start + 500]
+                rows = connection.execute(
+                    f"SELECT hash, language FROM languages WHERE detector = ? AND hash IN ({','.join('?' * len(batch))})",
+                    [DETECTOR_VERSION, *batch],
+                )
+                stored.update(rows)
+        with self._lock:
+            self._memory.update(stored)
+        found.update(stored)
+        return found
+
+    def put_many(self, languages, persist=True):
+        """Remember {hash: language} pairs, in memory only when persist is False"""
+        with self._lock:
+            self._memory.update(languages)
+        if not self.path or not persist:
+            return
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO languages (hash, language, detector) VALUES (?, ?, ?)",
+                [(caption_key, language, DETECTOR_VERSION) for caption_key, language in languages.items()],
+            )
+
+
+_cache_lock = threading.Lock()
+_language_cache = None
+
+
+def get_language_cache():
+    """Language cache shared by the whole process"""
+    global _language_cache
+    with _cache_lock:
+        if _language_cache is None:
+            _language_cache = LanguageCache()
+        return _language_cache
+
+
+def _detect_captions(captions, workers, chunk_size, min_parallel):
+    if workers <= 1 or len(captions) < max(min_parallel, chunk_size):
+        return detect_chunk(captions)
+
+    chunks = [captions[start:start + chunk_size] for start in range(0, len(captions), chunk_size)]
+    # Spawned rather than forked, forking the threaded Streamlit server is not safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as executor:
+        # map() yields in submission order
+        return [language for languages in executor.map(detect_chunk, chunks) for language in languages]
+
+
+def detect_languages(captions, cache=None, workers=LANGUAGE_WORKERS, chunk_size=LANGUAGE_CHUNK_SIZE, min_parallel=MIN_PARALLEL_CAPTIONS):
+    """
+    Language of every caption, each distinct caption detected at most once
+
+    Most captions are decided by their script alone (script_language). The others
+    are looked up in the language cache by hash first, the rest are detected (on a
+    process pool for large batches) and added to the cache.
+
+    Args:
+        captions (list): Caption strings
+        cache (LanguageCache, optional): Defaults to the process-wide cache
+        workers (int): Worker processes
+        chunk_size (int): Captions per task
+        min_parallel (int): Fewer new captions than this are detected in-process
+
+    Returns:
+        list: One language code per caption, see detect_language
+    """
+    # The script check is cheap, only captions it can't decide go to the cache and langdetect
+    result = [script_language(caption) for caption in captions]
+    rows = [row for row, language in enumerate(result) if language is None]
+    if not rows:
+        return result
+
+    cache = cache or get_language_cache()
+    hashes = [caption_hash(captions[row]) for row in rows]
+    languages = cache.get_many(set(hashes))
+
+    new_captions = {}
+    for caption_key, row in zip(hashes, rows):
+        if caption_key not in languages:
+            new_captions.setdefault(caption_key, captions[row])
+
+    if new_captions:
+        detected = dict(zip(new_captions, _detect_captions(list(new_captions.values()), workers, chunk_size, min_parallel)))
+        # Without langdetect they were all taken as Arabic. That guess is kept in memory only,
+        # so the captions are detected for real once langdetect is installed.
+        cache.put_many(detected, persist=_detector_factory() is not None)
+        languages.update(detected)
+
+        # Imported here, perf_metrics imports Streamlit and the spawned workers import this module
+        import perf_metrics
+        perf_metrics.log(f"Detected the language of {len(detected)} new captions, {len(set(hashes)) - len(detected)} were cached")
+
+    for caption_key, row in zip(hashes, rows):
+        result[row] = languages[caption_key]
+    return result
@@ -0,0 +1,131 @@
+import re
+
+import numpy as np
+
+from theme_classifier import classify_text_blobs
+
+
+# Arabic terms of the THEME_KEYWORDS themes, as used by Gulf and Egyptian developers.
+# Written in regular spelling, they are normalized (see normalize_arabic) when compiled.
+# Matching is by substring like the English terms, so short words that also occur inside
+# common words (تنس in تنسيق, شرفة in مشرفة) are only listed as part of a phrase.
+ARABIC_THEME_KEYWORDS = {
+    "Sustainability": [
+        "طاقة شمسية", "ألواح شمسية", "صديق للبيئة", "صديقة للبيئة", "الاستدامة", "مستدام", "طاقة متجددة",
+        "موفر للطاقة", "كفاءة الطاقة", "مباني خضراء", "مبنى أخضر", "إعادة التدوير", "حياد كربوني", "ترشيد المياه",
+        "طاقة نظيفة", "البصمة الكربونية"
+    ],
+    "Smart Home Technology": [
+        "منزل ذكي", "منازل ذكية", "المنزل الذكي", "بيت ذكي", "ذكي", "أتمتة", "تحكم عن بعد", "التحكم الصوتي",
+        "أقفال ذكية", "إنترنت الأشياء", "أليكسا", "مساعد صوتي", "أنظمة ذكية", "إضاءة ذكية"
+    ],
+    "Wellness Amenities": [
+        "منتجع صحي", "ساونا", "مساج", "تدليك", "تأمل", "استرخاء", "العافية", "مركز صحي", "جاكوزي", "حمام بخار",
+        "علاج طبيعي", "غرفة بخار"
+    ],
+    "House Features": [
+        "غرفة نوم رئيسية", "جناح رئيسي", "غرفة خادمة", "غرفة غسيل", "مطبخ مفتوح", "مطبخ حديث", "مدفأة", "الشرفة", "شرفات",
+        "بلكونة", "تراس", "أسقف عالية", "سقف عالي", "غرفة ملابس", "خزانة ملابس", "مساحات واسعة", "واسعة",
+        "نوافذ كبيرة", "مكتب منزلي", "مخزن", "قبو", "أرضيات خشبية", "رخام", "تكييف مركزي"
+    ],
+    "Interior Design": [
+        "تصميم داخلي", "ديكور", "تشطيبات فاخرة", "تشطيب", "فاخر", "عصري", "كلاسيك", "مودرن", "معاصر", "أثاث",
+        "تصميم فريد", "لمسات فاخرة"
+    ],
+    "Sports/Activities": [
+        "ملعب تنس", "ملاعب تنس", "كرة سلة", "كرة قدم", "كرة طائرة", "لياقة", "جولف", "غولف", "يوغا", "ركوب الدراجات", "دراجات",
+        "تمارين", "رياضة", "رياضي", "سباحة", "صالة رياضية", "الجيم", "ملاعب", "ملعب", "ملاعب بادل", "ملعب بادل", "مسار للجري"
+    ],
+    "Amenities": [
+        "مجمع مسور", "كمبوند", "مسبح", "حمام سباحة", "نادي", "مركز لياقة", "حديقة", "شواء", "باربكيو", "سينما",
+        "مطعم", "مطاعم", "كلوب هاوس", "مرافق", "حراسة"
+    ],
+    "Safety": [
+        "حراسة أمنية", "كاميرات مراقبة", "مراقبة", "إنذار حريق", "إنذار", "مخرج طوارئ", "طوارئ", "السلامة",
+        "إطفاء", "دخول آمن", "بوابة أمنية", "انتركم", "كاشف دخان", "أمن على مدار الساعة", "حماية"
+    ],
+    "Entertainment": [
+        "ترفيه", "سينما", "غرفة ألعاب", "ألعاب", "موسيقى", "حفلات", "فعاليات", "كاريوكي", "لاونج", "مقهى",
+        "كافيه", "سهرات"
+    ],
+    "Working Space": [
+        "مساحة عمل", "مساحات عمل", "مكاتب", "مكتب خاص", "مركز أعمال", "قاعة اجتماعات", "قاعات اجتماعات",
+        "عمل مشترك", "العمل عن بعد", "إنترنت عالي السرعة", "واي فاي", "مكاتب إدارية"
+    ],
+    "Greenery": [
+        "مساحات خضراء", "مسطحات خضراء", "حدائق", "حديقة", "جنينة", "أشجار", "طبيعة", "منتزه", "حديقة نباتية",
+        "بحيرة", "لاجون", "تنسيق حدائق", "أخضر"
+    ],
+    "Pet-Friendly Amenities": [
+        "حيوانات أليفة", "الحيوانات الأليفة", "صديق للحيوانات", "حديقة كلاب", "كلاب", "قطط", "عيادة بيطرية", "بيطري"
+    ],
+    "Disabled People Amenities": [
+        "ذوي الاحتياجات الخاصة", "ذوي الهمم", "أصحاب الهمم", "كراسي متحركة", "كرسي متحرك", "منحدرات", "مصاعد",
+        "مصعد", "أسانسير", "سهولة الوصول"
+    ],
+    "Children Amenities": [
+        "أطفال", "ملعب أطفال", "منطقة ألعاب", "حضانة", "مدرسة", "مدارس", "نادي أطفال", "عائلي", "العائلة"
+    ],
+    "Parking Amenities": [
+        "موقف", "مواقف", "مواقف سيارات", "كراج", "جراج", "باركنج", "صف السيارات", "فاليه", "شحن السيارات الكهربائية",
+        "موقف مغطى", "مواقف مغطاة"
+    ],
+    "Views": [
+        "إطلالة", "إطلالات", "بانورامي", "إطلالة بحرية", "على البحر", "شاطئ", "واجهة بحرية", "منظر", "مناظر",
+        "أفق المدينة", "غروب الشمس", "شروق الشمس"
+    ],
+}
+
+_ARABIC_DIACRITICS = re.compile(r"[\u064B-\u0652\u0670\u0640]")
+_ARABIC_LETTERS = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه", "ؤ": "و", "ئ": "ي"})
+
+
+def normalize_arabic(text):
+    """Arabic text without diacritics and tatweel, with the alef, yeh and teh marbuta variants unified"""
+    return _ARABIC_DIACRITICS.sub("", text).translate(_ARABIC_LETTERS)
+
+
+# Languages with their own theme dictionary, and how their text is normalized
+LANGUAGE_THEME_KEYWORDS = {
+    "ar": ARABIC_THEME_KEYWORDS,
+}
+LANGUAGE_NORMALIZERS = {
+    "ar": normalize_arabic,
+}
+
+
+def language_theme_keywords(language, themes):
+    """
+    Normalized keyword dictionary of a language, with the themes in the given order so
+    the theme bits line up with THEME_KEYWORDS. Themes it has no terms for stay empty.
+    """
+    normalize = LANGUAGE_NORMALIZERS.get(language, str.lower)
+    theme_keywords = LANGUAGE_THEME_KEYWORDS[language]
+    return {theme: [normalize(keyword) for keyword in theme_keywords.get(theme, [])] for theme in themes}
+
+
+def language_theme_masks(text_blobs, languages, themes):
+    """
+    Theme bitmasks from the per-language dictionaries
+
+    Every post is matched against the dictionary of its language only, the English
+    THEME_KEYWORDS still apply to every post. The matchers are compiled once per
+    language (get_theme_matcher) and large languages go through the classification pool.
+
+    Args:
+        text_blobs (list): Lowercased caption + hashtag blobs
+        languages (ndarray): Language code of each blob
+        themes (list): Theme names, bit i of a mask is themes[i]
+
+    Returns:
+        ndarray: One int64 bitmask per blob, 0 where no term of its language matched
+    """
+    masks = np.zeros(len(text_blobs), dtype=np.int64)
+    for language in LANGUAGE_THEME_KEYWORDS:
+        rows = np.flatnonzero(languages == language)
+        if not len(rows):
+            continue
+        normalize = LANGUAGE_NORMALIZERS.get(language, str.lower)
+        language_masks, _, _, _ = classify_text_blobs([normalize(text_blobs[row]) for row in rows], language_theme_keywords(language, themes))
+        masks[rows] = language_masks
+    return masks
@@ -0,0 +1,400 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+# Set PERF_METRICS=1 to time the developer_data functions and the dashboard sections.
+# Off, nothing is wrapped, section() returns a shared no-op timer and log() prints nothing.
+PERF_PANEL = os.environ.get("PERF_PANEL", "") not in ("", "0")
+PERF_METRICS = PERF_PANEL or os.environ.get("PERF_METRICS", "") not in ("", "0")
+
+# File the metrics are exported to: *.jsonl gets one JSON line per rerun, any other
+# path the process totals in the Prometheus text format (for the node_exporter
+# textfile collector). "{pid}" is replaced so worker processes don't overwrite each other.
+PERF_METRICS_EXPORT = os.environ.get("PERF_METRICS_EXPORT", "")
+
+# Seconds between two rewrites of the Prometheus file, JSON lines are appended on every rerun
+PERF_EXPORT_INTERVAL = float(os.environ.get("PERF_EXPORT_INTERVAL", 15))
+
+# Reruns of a session listed in the debug panel
+PERF_PANEL_RUNS = int(os.environ.get("PERF_PANEL_RUNS", 20))
+
+
+def _new_stats(kind):
+    return {
+        "kind": kind,
+        "calls": 0,
+        "seconds": 0.0,
+        "self_seconds": 0.0,
+        "rows_in": 0,
+        "rows_out": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+    }
+
+
+def _add(stats, timer, elapsed):
+    stats["calls"] += 1
+    stats["seconds"] += elapsed
+    stats["self_seconds"] += elapsed - timer.nested
+    stats["rows_in"] += timer.rows_in or 0
+    stats["rows_out"] += timer.rows_out or 0
+    stats["cache_hits"] += timer.cache_hits
+    stats["cache_misses"] += timer.cache_misses
+
+
+# Totals of this process by timer name, and by run name
+_lock = threading.Lock()
+_totals = {}
+_runs = {}
+
+# Timers and the run in progress, per script thread
+_local = threading.local()
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class Timer:
+    """
+    Times one call of a function or one section of a dashboard
+
+    Nested timers are subtracted from the self time, like startup_profiler does for
+    imports. A section entered outside of a run (a fragment rerunning on its own)
+    is recorded as a run of its own.
+    """
+
+    __slots__ = ("name", "kind", "rows_in", "rows_out", "cache_hits", "cache_misses", "nested", "started", "owns_run")
+
+    def __init__(self, name, kind="section", rows_in=None):
+        self.name = name
+        self.kind = kind
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.nested = 0.0
+        self.owns_run = False
+
+    def __enter__(self):
+        if self.kind == "section" and getattr(_local, "run", None) is None:
+            begin_run(self.name)
+            self.owns_run = True
+        _stack().append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        stack = _stack()
+        stack.pop()
+        if stack:
+            stack[-1].nested += elapsed
+
+        with _lock:
+            _add(_totals.setdefault(self.name, _new_stats(self.kind)), self, elapsed)
+        run = getattr(_local, "run", None)
+        if run is not None:
+            _add(run["timers"].setdefault(self.name, _new_stats(self.kind)), self, elapsed)
+
+        if self.owns_run:
+            end_run()
+
+
+class _NullTimer:
+    """Stands in for Timer when metrics are off, rows set on it are dropped"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def section(name, rows_in=None):
+    """
+    Timer of a dashboard section, used as a context manager:
+
+        with perf_metrics.section("dashboard_developer/snapshot") as timer:
+            snapshot = ...
+            timer.rows_out = snapshot.total_posts
+    """
+    if not PERF_METRICS:
+        return _NULL_TIMER
+    return Timer(name, "section", rows_in)
+
+
+def note_cache(hit):
+    """Count a cache hit or miss on the innermost running timer"""
+    if not PERF_METRICS:
+        return
+    stack = _stack()
+    if stack:
+        if hit:
+            stack[-1].cache_hits += 1
+        else:
+            stack[-1].cache_misses += 1
+
+
+def log(message):
+    """Print a build or timing message of the hot paths, only when metrics are on"""
+    if PERF_METRICS:
+        print(message)
+
+
+def _rows(value):
+    # Accounts of account lists, rows of frames and arrays, entries of dicts
+    if isinstance(value, (list, dict, pd.DataFrame, pd.Series, np.ndarray)):
+        return len(value)
+    return None
+
+
+def timed(name, kind="function"):
+    """
+    Decorator timing every call of a function, with len() of its first argument and
+    of its result as rows in and out. Returns the function as is when metrics are off.
+    """
+    def decorator(function):
+        if not PERF_METRICS:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            timer = Timer(name, kind, _rows(args[0]) if args else None)
+            with timer:
+                result = function(*args, **kwargs)
+                timer.rows_out = _rows(result)
+            return result
+
+        return wrapper
+    return decorator
+
+
+def instrument(namespace, module_name):
+    """
+    Wrap every public function defined in a module with timed, called at the end of
+    the module with globals(). Calls between the module's own functions are timed too.
+    """
+    if not PERF_METRICS:
+        return
+    for name, value in list(namespace.items()):
+        if name.startswith("_") or not inspect.isfunction(value) or value.__module__ != module_name:
+            continue
+        namespace[name] = timed(f"{module_name}.{name}")(value)
+
+
+def begin_run(name):
+    """Start recording a script run, every timer until end_run() is part of it"""
+    if not PERF_METRICS:
+        return
+    _local.stack = []
+    _local.run = {
+        "name": name,
+        "started_at": time.time(),
+        "started": time.perf_counter(),
+        "timers": {},
+    }
+
+
+def end_run():
+    """
+    Finish the run of this thread, export it and keep it for the debug panel
+
+    Returns:
+        dict: name, started_at (epoch seconds), seconds and the per-timer stats of
+        the run, None when no run was being recorded
+    """
+    run = getattr(_local, "run", None)
+    if run is None:
+        return None
+    _local.run = None
+    run["seconds"] = time.perf_counter() - run.pop("started")
+
+    with _lock:
+        totals = _runs.setdefault(run["name"], {"runs": 0, "seconds": 0.0})
+        totals["runs"] += 1
+        totals["seconds"] += run["seconds"]
+
+    _export(run)
+    if PERF_PANEL and get_script_run_ctx(suppress_warning=True) is not None:
+        runs = st.session_state.setdefault("perf_runs", deque(maxlen=PERF_PANEL_RUNS))
+        runs.append(run)
+    return run
+
+
+def get_metrics():
+    """Copy of the process totals: {"timers": {name: stats}, "runs": {name: {runs, seconds}}}"""
+    with _lock:
+        return {
+            "timers": {name: dict(stats) for name, stats in _totals.items()},
+            "runs": {name: dict(totals) for name, totals in _runs.items()},
+        }
+
+
+def reset_metrics():
+    with _lock:
+        _totals.clear()
+        _runs.clear()
+
+
+# -----------------------------
+# Export
+# -----------------------------
+
+_export_lock = threading.Lock()
+_export_state = {"written_at": 0.0, "disabled": False}
+
+
+def _export_path(path=None):
+    path = PERF_METRICS_EXPORT if path is None else path
+    return path.replace("{pid}", str(os.getpid()))
+
+
+def _export(run):
+    path = _export_path()
+    if not path or _export_state["disabled"]:
+        return
+    try:
+        if path.endswith(".jsonl"):
+            write_json_line(run, path)
+        else:
+            now = time.monotonic()
+            with _export_lock:
+                if now - _export_state["written_at"] < PERF_EXPORT_INTERVAL:
+                    return
+                _export_state["written_at"] = now
+            write_prometheus(path)
+    except ImportError:
+        print("prometheus_client is not installed, performance metrics are not exported")
+        _export_state["disabled"] = True
+    except OSError as e:
+        # Never fail the page over the metrics
+        print(f"Failed to export performance metrics to {path}: {e}")
+
+
+def write_json_line(run, path):
+    """Append one run as a JSON line"""
+    line = json.dumps({
+        "time": datetime.fromtimestamp(run["started_at"]).isoformat(timespec="milliseconds"),
+        "pid": os.getpid(),
+        "run": run["name"],
+        "seconds": run["seconds"],
+        "timers": run["timers"],
+    })
+    with _export_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class _MetricsCollector:
+    """prometheus_client collector of the process totals"""
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily
+
+        metrics = get_metrics()
+        families = {
+            "calls": CounterMetricFamily("dashboard_calls", "Calls of a timed function or section", labels=["name", "kind"]),
+            "seconds": CounterMetricFamily("dashboard_seconds", "Wall time of a timed function or section", labels=["name", "kind"]),
+            "self_seconds": CounterMetricFamily("dashboard_self_seconds", "Wall time without the nested timers", labels=["name", "kind"]),
+            "rows_in": CounterMetricFamily("dashboard_rows_in", "Rows passed in (accounts, frame rows)", labels=["name", "kind"]),
+            "rows_out": CounterMetricFamily("dashboard_rows_out", "Rows returned (accounts, frame rows)", labels=["name", "kind"]),
+            "cache_hits": CounterMetricFamily("dashboard_cache_hits", "Cache hits during the calls", labels=["name", "kind"]),
+            "cache_misses": CounterMetricFamily("dashboard_cache_misses", "Cache misses during the calls", labels=["name", "kind"]),
+        }
+        for name, stats in metrics["timers"].items():
+            for field, family in families.items():
+                family.add_metric([name, stats["kind"]], stats[field])
+        yield from families.values()
+
+        runs = CounterMetricFamily("dashboard_runs", "Script and fragment reruns", labels=["run"])
+        run_seconds = CounterMetricFamily("dashboard_run_seconds", "Wall time of the reruns", labels=["run"])
+        for name, totals in metrics["runs"].items():
+            runs.add_metric([name], totals["runs"])
+            run_seconds.add_metric([name], totals["seconds"])
+        yield runs
+        yield run_seconds
+
+
+def write_prometheus(path):
+    """Write the process totals in the Prometheus text format, atomically"""
+    from prometheus_client import CollectorRegistry, write_to_textfile
+
+    registry = CollectorRegistry()
+    registry.register(_MetricsCollector())
+    write_to_textfile(path, registry)
+
+
+# -----------------------------
+# Debug panel
+# -----------------------------
+
+def run_frame(run):
+    """Per-timer breakdown of a run, slowest first"""
+    rows = [
+        {
+            "Name": name,
+            "Kind": stats["kind"],
+            "Calls": stats["calls"],
+            "ms": stats["seconds"] * 1000,
+            "Self ms": stats["self_seconds"] * 1000,
+            "Rows in": stats["rows_in"],
+            "Rows out": stats["rows_out"],
+            "Cache hits": stats["cache_hits"],
+            "Cache misses": stats["cache_misses"],
+        }
+        for name, stats in run["timers"].items()
+    ]
+    return pd.DataFrame(rows, columns=["Name", "Kind", "Calls", "ms", "Self ms", "Rows in", "Rows out", "Cache hits", "Cache misses"]).sort_values("ms", ascending=False)
+
+
+def render_panel():
+    """Sidebar breakdown of the recent reruns of this session, only shown with PERF_PANEL=1"""
+    if not PERF_PANEL:
+        return
+    runs = list(st.session_state.get("perf_runs", ()))
+
+    with st.sidebar:
+        st.subheader("⏱️ Performance")
+        if not runs:
+            st.caption("No reruns recorded yet.")
+            return
+
+        # Latest first, fragment reruns are listed from the next full rerun on
+        runs.reverse()
+        labels = [f"{datetime.fromtimestamp(run['started_at']):%H:%M:%S} {run['name']} ({run['seconds'] * 1000:.0f}ms)" for run in runs]
+        choice = st.selectbox("Rerun", range(len(runs)), format_func=labels.__getitem__, key="perf_run")
+        run = runs[choice]
+
+        st.metric("Rerun time", f"{run['seconds'] * 1000:.0f}ms")
+        st.dataframe(
+            run_frame(run),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "ms": st.column_config.NumberColumn(format="%.1f"),
+                "Self ms": st.column_config.NumberColumn(format="%.1f"),
+            },
+        )
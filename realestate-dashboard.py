@@ -1,10 +1,22 @@
+import importlib
+
+# Times the cold start of a new process when STARTUP_PROFILE is set, started before the app modules are imported
+import startup_profiler
+startup_profiler.start()
+
 import streamlit as st
 
+import perf_metrics
+
 st.set_page_config(page_title="Realestate Dashboard", layout="wide")
 
 
-from goole_trends_dashboard import trends_dashboard
-from developer_dashboard import dashboard_developer
+# View label -> (module, dashboard function). Only the selected view's module is
+# imported and only its code runs on a rerun, unlike st.tabs which runs every tab
+VIEWS = {
+    "Developer Analysis": ("developer_dashboard", "dashboard_developer"),
+    "Search Trends": ("goole_trends_dashboard", "trends_dashboard"),
+}
 
 
 
@@ -81,13 +93,22 @@ navbar_html = """
 
 st.markdown(navbar_html, unsafe_allow_html=True)
 
-tab1, tab2 = st.tabs(["Developer Analysis", "Search Trends"])
-
+# The selected view is kept in the URL so it survives a reload and can be shared
+if st.query_params.get("view") in VIEWS and "view" not in st.session_state:
+    st.session_state["view"] = st.query_params["view"]
 
-with tab1:
-    dashboard_developer()
+view = st.radio("View", list(VIEWS), horizontal=True, key="view", label_visibility="collapsed")
+st.query_params["view"] = view
 
-with tab2:
-    trends_dashboard()
+module_name, function_name = VIEWS[view]
+# With PERF_METRICS=1 every rerun records the time of its sections, PERF_PANEL=1 also shows them in the sidebar
+perf_metrics.begin_run(view)
+try:
+    getattr(importlib.import_module(module_name), function_name)()
+finally:
+    perf_metrics.end_run()
+perf_metrics.render_panel()
 
+# Reports the import times and time-to-first-render once per process
+startup_profiler.first_render()
 
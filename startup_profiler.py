@@ -0,0 +1,215 @@
+import os
+import sys
+import threading
+import time
+
+
+# Set STARTUP_PROFILE=1 to time the module imports and the first render of a new process
+STARTUP_PROFILE = os.environ.get("STARTUP_PROFILE", "") not in ("", "0")
+
+# Time-to-first-render budget of a new worker process in seconds, 0 disables the check
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", 0))
+
+# Slowest modules listed in the report
+STARTUP_REPORT_TOP = int(os.environ.get("STARTUP_REPORT_TOP", 15))
+
+
+class _TimedLoader:
+    """Wraps the loader of a module being imported and times its execution"""
+
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        # Extension modules do their work here (loading the shared library)
+        with self._profiler.timing(self._name):
+            return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        try:
+            with self._profiler.timing(self._name):
+                self._loader.exec_module(module)
+        finally:
+            # Leave the module as if it had been imported normally
+            if module.__spec__ is not None and module.__spec__.loader is self:
+                module.__spec__.loader = self._loader
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self._loader
+
+
+class ImportProfiler:
+    """
+    Meta path finder recording how long every module imported after install() takes
+
+    Each module gets its cumulative time (including the modules it imports) and its
+    self time, the same figures as python -X importtime, but collected in process so
+    they can be reported from a running app.
+    """
+
+    def __init__(self):
+        self.cumulative = {}
+        self.own = {}
+        self.order = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        # Let the regular finders locate the module, only its loader is wrapped
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def timing(self, name):
+        return _Timing(self, name)
+
+    def _children(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+class _Timing:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        # Time spent in nested imports, subtracted to get the self time
+        self.profiler._children().append(0.0)
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        stack = self.profiler._children()
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        with self.profiler._lock:
+            if self.name not in self.profiler.cumulative:
+                self.profiler.order.append(self.name)
+            self.profiler.cumulative[self.name] = self.profiler.cumulative.get(self.name, 0.0) + elapsed
+            self.profiler.own[self.name] = self.profiler.own.get(self.name, 0.0) + elapsed - nested
+
+
+# Profile of this process, created by start()
+_profile = {
+    "profiler": None,
+    "started": None,
+    "first_render": None,
+}
+_profile_lock = threading.Lock()
+
+
+def start(force=False):
+    """
+    Start profiling the imports of this process, once. No-op unless STARTUP_PROFILE
+    is set or force is True.
+
+    Call it before the app imports its modules. Streamlit reruns the main script on
+    every interaction, later calls return the running profiler.
+    """
+    if not (STARTUP_PROFILE or force):
+        return None
+    with _profile_lock:
+        if _profile["profiler"] is None:
+            _profile["started"] = time.perf_counter()
+            _profile["profiler"] = ImportProfiler()
+            _profile["profiler"].install()
+        return _profile["profiler"]
+
+
+def first_render():
+    """
+    Record the end of the first script run of this process and print the startup report
+
+    Returns:
+        float: Seconds from start() to the first render, None when not profiling or
+        when the first render was already recorded
+    """
+    with _profile_lock:
+        if _profile["profiler"] is None or _profile["first_render"] is not None:
+            return None
+        _profile["first_render"] = time.perf_counter() - _profile["started"]
+        # Only the cold start is of interest, later imports are not timed
+        _profile["profiler"].uninstall()
+
+    print(format_report())
+    if STARTUP_BUDGET_SECONDS and _profile["first_render"] > STARTUP_BUDGET_SECONDS:
+        print(f"Startup budget exceeded: first render took {_profile['first_render']:.2f}s, budget is {STARTUP_BUDGET_SECONDS:.2f}s")
+    return _profile["first_render"]
+
+
+def import_timings(profiler=None):
+    """
+    Import times of the profiled modules
+
+    Returns:
+        list: (module, cumulative seconds, self seconds) tuples, slowest first
+    """
+    profiler = profiler or _profile["profiler"]
+    if profiler is None:
+        return []
+    with profiler._lock:
+        timings = [(name, profiler.cumulative[name], profiler.own[name]) for name in profiler.order]
+    return sorted(timings, key=lambda timing: timing[1], reverse=True)
+
+
+def format_report(profiler=None, top=STARTUP_REPORT_TOP):
+    timings = import_timings(profiler)
+    total = sum(own for _, _, own in timings)
+    lines = [f"Startup: {len(timings)} modules imported in {total:.2f}s"]
+    if _profile["first_render"] is not None and (profiler is None or profiler is _profile["profiler"]):
+        lines[0] += f", first render after {_profile['first_render']:.2f}s"
+    lines.append(f"{'cumulative':>12} {'self':>10}  module")
+    for name, cumulative, own in timings[:top]:
+        lines.append(f"{cumulative * 1000:10.1f}ms {own * 1000:8.1f}ms  {name}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Cold import check of the dashboard modules in a fresh interpreter:
+    #   python startup_profiler.py [module ...] [--budget SECONDS]
+    import argparse
+    import importlib
+
+    parser = argparse.ArgumentParser(description="Time the cold import of the dashboard modules")
+    parser.add_argument("modules", nargs="*", default=["developer_dashboard", "goole_trends_dashboard"])
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS, help="Fail when the imports take longer (seconds)")
+    parser.add_argument("--top", type=int, default=STARTUP_REPORT_TOP)
+    args = parser.parse_args()
+
+    profiler = start(force=True)
+    started = time.perf_counter()
+    for module in args.modules:
+        importlib.import_module(module)
+    elapsed = time.perf_counter() - started
+    profiler.uninstall()
+
+    print(format_report(profiler, args.top))
+    print(f"Imported {', '.join(args.modules)} in {elapsed:.2f}s")
+    if args.budget and elapsed > args.budget:
+        print(f"Startup budget exceeded: {elapsed:.2f}s, budget is {args.budget:.2f}s")
+        sys.exit(1)
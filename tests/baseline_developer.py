@@ -0,0 +1,230 @@
+"""
+List-based developer_data functions as they were before the post frame, the post
+index and the cube, the reference of the parity tests.
+
+Copied from the original developer_data.py with the MongoDB loading left out.
+"""
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+from rapidfuzz import fuzz
+
+from developer_data import THEME_KEYWORDS
+
+
+def _text_blob(post):
+    caption = (post.get("caption") or "").lower()
+    hashtags = [h.lower() for h in post.get("hashtags", [])]
+    return caption + " " + " ".join(hashtags)
+
+
+def _upload_date(post):
+    upload_date_str = post.get("upload_date")
+    if not upload_date_str:
+        return None
+    try:
+        return datetime.strptime(upload_date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def filter_data(data, selected_themes=None, selected_keywords=None, selected_accounts=None, date_range=None, selected_countries=None):
+    if not selected_themes and not selected_keywords and not selected_accounts and not date_range and not selected_countries:
+        return data
+
+    filtered_data = []
+    for account in data:
+        if selected_accounts and account.get("username", "") not in selected_accounts:
+            continue
+        if selected_countries and account.get("country", "") not in selected_countries:
+            continue
+
+        filtered_posts = []
+        for post in account.get("posts", []):
+            text_blob = _text_blob(post)
+
+            if date_range and isinstance(date_range, tuple) and len(date_range) == 2:
+                upload_date = _upload_date(post)
+                start_date, end_date = date_range
+                if isinstance(start_date, datetime):
+                    start_date = start_date.date()
+                if isinstance(end_date, datetime):
+                    end_date = end_date.date()
+                if upload_date is None or not start_date <= upload_date <= end_date:
+                    continue
+
+            if selected_themes:
+                post_themes = [
+                    theme for theme, keywords in THEME_KEYWORDS.items()
+                    if any(keyword.lower() in text_blob for keyword in keywords)
+                ]
+                if not post_themes:
+                    if "Others" not in selected_themes:
+                        continue
+                elif not any(theme in selected_themes for theme in post_themes):
+                    continue
+
+            if selected_keywords and not any(keyword.lower() in text_blob for keyword in selected_keywords):
+                continue
+
+            filtered_posts.append(post)
+
+        if filtered_posts:
+            filtered_account = account.copy()
+            filtered_account["posts"] = filtered_posts
+            filtered_data.append(filtered_account)
+
+    return filtered_data
+
+
+def get_total_engagements(data):
+    total_engagements = 0
+    for account in data:
+        for post in account.get("posts", []):
+            total_engagements += post.get("number_of_likes", 0) or 0
+            total_engagements += post.get("number_of_comments", 0) or 0
+            total_engagements += post.get("video_view_count", 0) or 0
+    return total_engagements
+
+
+def get_total_posts(data):
+    return sum(len(account.get("posts", [])) for account in data)
+
+
+def get_estimated_reach(data):
+    estimated_reach = 0
+    for account in data:
+        followers = account.get("followers", 0)
+        for post in account.get("posts", []):
+            engagement = (post.get("number_of_likes", 0) or 0) + (post.get("number_of_comments", 0) or 0) + (post.get("video_view_count", 0) or 0)
+            estimated_reach += (0.1 * followers) + (0.05 * engagement)
+    return int(estimated_reach)
+
+
+def get_total_countries(data):
+    return len({account.get("country", "") for account in data if account.get("country", "")})
+
+
+def get_post_trend_data(data):
+    post_dates = [upload_date for account in data for post in account.get("posts", []) if (upload_date := _upload_date(post))]
+    if not post_dates:
+        return pd.DataFrame(columns=["month", "post_count"])
+
+    df_posts = pd.DataFrame({"date": pd.to_datetime(post_dates)})
+    df_posts["month"] = df_posts["date"].dt.to_period("M").dt.to_timestamp()
+    return df_posts.groupby("month").size().reset_index(name="post_count")
+
+
+def get_engagement_trend_data(data):
+    engagement_data = []
+    for account in data:
+        for post in account.get("posts", []):
+            upload_date = _upload_date(post)
+            if upload_date:
+                engagement = (post.get("number_of_likes", 0) or 0) + (post.get("number_of_comments", 0) or 0) + (post.get("video_view_count", 0) or 0)
+                engagement_data.append((upload_date, engagement))
+    if not engagement_data:
+        return pd.DataFrame(columns=["month", "total_engagement"])
+
+    df_engagement = pd.DataFrame(engagement_data, columns=["date", "engagement"])
+    df_engagement["date"] = pd.to_datetime(df_engagement["date"])
+    df_engagement["month"] = df_engagement["date"].dt.to_period("M").dt.to_timestamp()
+    return df_engagement.groupby("month")["engagement"].sum().reset_index(name="total_engagement")
+
+
+def get_theme_distribution(data, allow_multiple_themes=True, fuzzy_threshold=60):
+    theme_counts = Counter()
+    theme_keywords_lower = {theme: [keyword.lower() for keyword in keywords] for theme, keywords in THEME_KEYWORDS.items()}
+
+    for account in data:
+        for post in account.get("posts", []):
+            caption = (post.get("caption") or "").lower()
+            hashtags = " ".join(tag.lower() for tag in post.get("hashtags", []))
+            text_blob = caption + " " + hashtags
+
+            # Phase 1: substring matching
+            matched_themes = set()
+            for theme, keywords in theme_keywords_lower.items():
+                if any(keyword in text_blob for keyword in keywords):
+                    matched_themes.add(theme)
+                    if not allow_multiple_themes:
+                        break
+
+            # Phase 2: fuzzy matching. The original only scored the first 10 keywords of
+            # each theme, every keyword is scored since the batched fuzzy phase
+            if not matched_themes and len(text_blob) > 3:
+                for theme, keywords in theme_keywords_lower.items():
+                    for keyword in keywords:
+                        if len(keyword) > 3 and fuzz.partial_ratio(keyword, text_blob) >= fuzzy_threshold:
+                            matched_themes.add(theme)
+                            if not allow_multiple_themes:
+                                break
+                    if not allow_multiple_themes and matched_themes:
+                        break
+
+            if matched_themes:
+                for theme in matched_themes:
+                    theme_counts[theme] += 1
+            else:
+                theme_counts["Others"] += 1
+
+    return dict(theme_counts)
+
+
+def get_theme_distribution_over_time(data):
+    theme_counts_over_time = {}
+    for account in data:
+        for post in account.get("posts", []):
+            upload_date = _upload_date(post)
+            if upload_date is None:
+                continue
+            month_year = upload_date.strftime("%Y-%m")
+            counts = theme_counts_over_time.setdefault(month_year, Counter())
+
+            # Each post counts towards its first theme
+            text_blob = _text_blob(post)
+            for theme, keywords in THEME_KEYWORDS.items():
+                if any(keyword.lower() in text_blob for keyword in keywords):
+                    counts[theme] += 1
+                    break
+            else:
+                counts["Others"] += 1
+
+    return pd.DataFrame([
+        {"Month": month_year, "Theme": theme, "Post Count": count}
+        for month_year, counts in theme_counts_over_time.items()
+        for theme, count in counts.items()
+    ])
+
+
+def get_top_keywords(data, top_n=10):
+    keyword_counts = Counter()
+    for account in data:
+        for post in account.get("posts", []):
+            text_blob = _text_blob(post)
+            # The original counted text_blob.count(keyword), so mixed-case terms such as
+            # "IoT" never matched the lowercased blob. The keyword matrix counts them.
+            for keywords in THEME_KEYWORDS.values():
+                for keyword in keywords:
+                    keyword_counts[keyword] += text_blob.count(keyword.lower())
+
+    return pd.DataFrame([{"Keyword": keyword, "Count": count} for keyword, count in keyword_counts.most_common(top_n)])
+
+
+def get_accounts(data):
+    rows = []
+    for account in data:
+        username = account.get("username", "")
+        for post in account.get("posts", []):
+            rows.append({
+                "User Name": username,
+                "Full Name": account.get("full_name", ""),
+                "Followers": account.get("followers", 0),
+                "Following": account.get("following", 0),
+                "Countries": account.get("country", ""),
+                "Post URL": post.get("url", ""),
+                "Profile URL": f"https://www.instagram.com/{username}",
+                "External URL": account.get("external_url", ""),
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,49 @@
+"""
+The list-based trends page as it was before the precomputed views, the reference
+of the trends parity tests. Copied from the original goole_trends_dashboard.py
+with the MongoDB loading left out.
+"""
+import pandas as pd
+
+
+COUNTRY_CODE_MAP = {
+    "AE": "United Arab Emirates",
+    "EG": "Egypt",
+    "GB": "United Kingdom",
+    "SA": "Saudi Arabia"
+}
+
+
+def trends_frame(docs):
+    timeline_data = []
+    for doc in docs:
+        for entry in doc.get("timeline", []):
+            entry = dict(entry, theme=doc.get("theme"))
+            entry["country"] = COUNTRY_CODE_MAP.get(entry.get("geo"), entry.get("geo"))
+            timeline_data.append(entry)
+    return pd.DataFrame(timeline_data)
+
+
+def trends_view(df, selected_theme="All", selected_country="All"):
+    """The frames the trends page plotted for a selection, None when nothing matches"""
+    filtered_df = df.copy()
+    if selected_theme != "All":
+        filtered_df = filtered_df[filtered_df["theme"] == selected_theme]
+    if selected_country != "All":
+        filtered_df = filtered_df[filtered_df["country"] == selected_country]
+    if filtered_df.empty:
+        return None
+    filtered_df["date"] = pd.to_datetime(filtered_df["date"])
+
+    theme_avg = filtered_df.groupby("theme", as_index=False)["value"].mean()
+    keyword_avg = filtered_df.groupby("keyword", as_index=False)["value"].mean()
+    top_3_themes = filtered_df.groupby("theme")["value"].mean().nlargest(3).index.tolist()
+    top_3_keywords = filtered_df.groupby("keyword")["value"].mean().nlargest(3).index.tolist()
+
+    return {
+        "top_themes": theme_avg.sort_values("value", ascending=False).head(5),
+        "theme_distribution": theme_avg.query("value > 0").sort_values("value", ascending=False),
+        "theme_trend": filtered_df[filtered_df["theme"].isin(top_3_themes)].groupby(["date", "theme"], as_index=False)["value"].mean(),
+        "top_keywords": keyword_avg.sort_values("value", ascending=False).head(15),
+        "keyword_trend": filtered_df[filtered_df["keyword"].isin(top_3_keywords)].groupby(["date", "keyword"], as_index=False)["value"].mean(),
+    }
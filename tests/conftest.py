@@ -0,0 +1,118 @@
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+# The dashboard modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the language cache of the tests in memory
+os.environ.setdefault("LANGUAGE_CACHE_PATH", "")
+
+from developer_data import THEME_KEYWORDS  # noqa: E402
+
+
+FILLER_WORDS = "the a new home with our best and great launch today in dubai cairo london villa tower".split()
+COUNTRIES = ["United Arab Emirates", "Egypt", "United Kingdom", "Saudi Arabia", ""]
+TREND_GEOS = ["AE", "EG", "GB", "SA", "US"]
+
+
+def _misspelled(keyword, rnd):
+    # Drops one letter, for the fuzzy phase of the theme distribution
+    position = rnd.randrange(len(keyword))
+    return keyword[:position] + keyword[position + 1:]
+
+
+def _upload_date(rnd):
+    day = date(2023, 1, 1) + timedelta(days=rnd.randrange(730))
+    return rnd.choice([
+        day.isoformat(), day.isoformat(), day.isoformat(), day.isoformat(),
+        f"{day.year}-{day.month}-{day.day}",  # not zero padded, strptime accepts it
+        None, "", "not a date", "2024-02-30",
+    ])
+
+
+def make_developer_docs(n_accounts=40, posts_per_account=25, seed=0):
+    """
+    Accounts shaped like the realestate-developers collection, English captions only,
+    with the edge cases the dashboards handle: missing captions, likes and views,
+    missing, malformed and non zero padded dates, accounts without posts or country.
+    """
+    rnd = random.Random(seed)
+    keywords = [keyword for keywords in THEME_KEYWORDS.values() for keyword in keywords]
+
+    docs = []
+    for account_number in range(n_accounts):
+        posts = []
+        for post_number in range(rnd.choice([0, posts_per_account // 2, posts_per_account, posts_per_account])):
+            words = rnd.sample(FILLER_WORDS, 4)
+            for keyword in rnd.sample(keywords, rnd.choice([0, 0, 1, 1, 2, 3])):
+                words.append(_misspelled(keyword, rnd) if rnd.random() < 0.3 else rnd.choice([keyword, keyword.upper(), keyword.title()]))
+            rnd.shuffle(words)
+            posts.append({
+                "caption": " ".join(words) if rnd.random() > 0.1 else None,
+                "hashtags": [rnd.choice(keywords).replace(" ", "") for _ in range(rnd.choice([0, 0, 1, 2]))],
+                "upload_date": _upload_date(rnd),
+                "number_of_likes": rnd.choice([None, 0, rnd.randrange(1, 5_000)]),
+                "number_of_comments": rnd.randrange(0, 200),
+                "video_view_count": rnd.choice([None, None, rnd.randrange(0, 100_000)]),
+                "url": f"https://www.instagram.com/p/{seed}-{account_number}-{post_number}/",
+            })
+        docs.append({
+            "username": f"developer_{account_number}",
+            "full_name": rnd.choice(["Emaar Properties", "Sodic", "Aldar", "Berkeley Homes", ""]) + f" {account_number}",
+            "followers": rnd.randrange(0, 2_000_000),
+            "following": rnd.randrange(0, 2_000),
+            "country": rnd.choice(COUNTRIES),
+            "external_url": rnd.choice(["", f"https://developer{account_number}.example.com"]),
+            "posts": posts,
+        })
+    return docs
+
+
+def make_trend_docs(n_themes=6, n_keywords=5, n_weeks=60, seed=0):
+    """Theme documents shaped like the google-trends collection"""
+    rnd = random.Random(seed)
+    docs = []
+    for theme_number in range(n_themes):
+        timeline = []
+        for keyword_number in range(n_keywords):
+            # One keyword is tracked under every theme
+            keyword = f"keyword {theme_number}-{keyword_number}" if keyword_number else "shared keyword"
+            for geo in rnd.sample(TREND_GEOS, 3):
+                base = rnd.uniform(0, 60)
+                slope = rnd.uniform(-0.3, 0.5)
+                for week in range(n_weeks):
+                    if rnd.random() < 0.05:
+                        continue
+                    timeline.append({
+                        "date": (date(2023, 1, 1) + timedelta(weeks=week)).isoformat(),
+                        "keyword": keyword,
+                        "geo": geo,
+                        "value": max(0, min(100, int(base + slope * week + rnd.gauss(0, 5)))),
+                    })
+        docs.append({"theme": f"Theme {theme_number}", "timeline": timeline})
+    return docs
+
+
+@pytest.fixture(params=[0, 1, 2])
+def developer_docs(request):
+    return make_developer_docs(seed=request.param)
+
+
+@pytest.fixture
+def indexed_docs(developer_docs):
+    """A dataset indexed and cubed the way get_data loads it"""
+    from developer_cube import cube_dataset
+    from developer_index import index_dataset
+
+    index = index_dataset(developer_docs, THEME_KEYWORDS)
+    cube_dataset(developer_docs, index)
+    return developer_docs
+
+
+@pytest.fixture(params=[0, 1])
+def trend_docs(request):
+    return make_trend_docs(seed=request.param)
@@ -0,0 +1,62 @@
+"""Random filter specs and comparisons shared by the parity tests"""
+import random
+from datetime import date, datetime
+
+import pandas as pd
+
+from developer_data import THEME_KEYWORDS
+
+
+def filter_specs(docs, n_specs=25, seed=0):
+    """Random filter_data keyword arguments, every filter alone and combined"""
+    rnd = random.Random(seed)
+    themes = list(THEME_KEYWORDS) + ["Others"]
+    keywords = [keyword for keywords in THEME_KEYWORDS.values() for keyword in keywords]
+    usernames = [account["username"] for account in docs]
+    countries = sorted({account["country"] for account in docs})
+
+    specs = [{}]
+    for _ in range(n_specs):
+        start = date(2023, 1, 1) + pd.Timedelta(days=rnd.randrange(700))
+        end = start + pd.Timedelta(days=rnd.randrange(1, 400))
+        spec = {
+            "selected_themes": rnd.sample(themes, rnd.randint(1, 3)),
+            "selected_keywords": rnd.sample(keywords, rnd.randint(1, 4)),
+            "selected_accounts": rnd.sample(usernames, rnd.randint(1, 10)),
+            "selected_countries": rnd.sample(countries, rnd.randint(1, 2)),
+            "date_range": rnd.choice([(start, end), (datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time()))]),
+        }
+        # Between one and all of the filters
+        kept = rnd.sample(list(spec), rnd.randint(1, len(spec)))
+        specs.append({name: value for name, value in spec.items() if name in kept})
+    return specs
+
+
+def assert_same_posts(actual, expected):
+    assert [account["username"] for account in actual] == [account["username"] for account in expected]
+    for actual_account, expected_account in zip(actual, expected):
+        assert [post["url"] for post in actual_account["posts"]] == [post["url"] for post in expected_account["posts"]]
+
+
+def assert_same_frame(actual, expected):
+    # The baseline's empty frames have no columns
+    if expected.empty:
+        assert actual.empty
+        return
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+
+
+def sorted_frame(df, columns):
+    return df.sort_values(columns).reset_index(drop=True) if len(df) else df
+
+
+def exact_reach(data):
+    """
+    get_estimated_reach of the baseline without float rounding. Its float sum can end
+    just below a whole number and truncate to one less, the indexed paths count exactly.
+    """
+    twentieths = sum(
+        2 * account.get("followers", 0) + (post.get("number_of_likes", 0) or 0) + (post.get("number_of_comments", 0) or 0) + (post.get("video_view_count", 0) or 0)
+        for account in data for post in account.get("posts", [])
+    )
+    return twentieths // 20
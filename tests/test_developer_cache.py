@@ -0,0 +1,52 @@
+import copy
+import threading
+
+import pytest
+
+import developer_data
+from developer_cache import get_filtered_data, make_filter_spec
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def client(developer_docs):
+    client = mongomock.MongoClient()
+    developer_data.get_collection(client).insert_many(copy.deepcopy(developer_docs))
+    developer_data.clear_data_cache()
+    yield client
+    developer_data.clear_data_cache()
+
+
+def test_versioned_data_is_read_atomically(client):
+    data, version = developer_data.get_versioned_data(client)
+    assert developer_data.get_versioned_data(client) == (data, version)
+
+    refreshed, refreshed_version = developer_data.get_versioned_data(client, refresh=True)
+    assert refreshed is not data
+    assert refreshed_version == version + 1
+    assert developer_data.get_data(client) is refreshed
+
+
+def test_views_are_cached_under_the_version_of_their_data(client):
+    spec = make_filter_spec(selected_themes=["Sustainability"])
+    results = []
+
+    def session():
+        # Every call reloads the dataset, sessions keep replacing each other's snapshot
+        for _ in range(10):
+            data, version = developer_data.get_versioned_data(client, ttl=0)
+            results.append((data, version, get_filtered_data(data, spec, version)))
+
+    threads = [threading.Thread(target=session) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    data_by_version = {}
+    for data, version, filtered in results:
+        assert data_by_version.setdefault(version, data) is data
+        # The view cached under a version is the view of that version's data
+        assert [post["url"] for account in filtered for post in account["posts"]] == \
+            [post["url"] for account in developer_data.filter_data(data, spec.themes) for post in account["posts"]]
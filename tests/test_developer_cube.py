@@ -0,0 +1,70 @@
+import random
+
+import pandas as pd
+import pytest
+
+import baseline_developer
+import developer_data
+from developer_cache import make_filter_spec
+from developer_cube import cube_dataset, get_cube
+from developer_index import index_dataset
+from developer_snapshot import DashboardSnapshot
+from parity import assert_same_frame, exact_reach, filter_specs, sorted_frame
+
+
+def cube_specs(docs, n_specs=150, seed=9):
+    # The cube serves every filter but keywords
+    specs = filter_specs(docs, n_specs, seed)
+    for spec in specs:
+        spec.pop("selected_keywords", None)
+    return specs
+
+
+def test_rollups_match_baseline(indexed_docs):
+    cube = get_cube(indexed_docs)
+    for spec in cube_specs(indexed_docs):
+        rollup = cube.rollup(spec.get("selected_themes"), spec.get("selected_accounts"), spec.get("date_range"), spec.get("selected_countries"))
+        expected = baseline_developer.filter_data(indexed_docs, **spec)
+
+        assert rollup.total_accounts == len(expected)
+        assert rollup.total_countries == baseline_developer.get_total_countries(expected)
+        assert rollup.total_posts == baseline_developer.get_total_posts(expected)
+        assert rollup.total_engagements == baseline_developer.get_total_engagements(expected)
+        assert rollup.estimated_reach == exact_reach(expected)
+        assert_same_frame(rollup.post_trend, baseline_developer.get_post_trend_data(expected))
+        assert_same_frame(rollup.engagement_trend, baseline_developer.get_engagement_trend_data(expected))
+        assert_same_frame(
+            sorted_frame(rollup.theme_distribution_over_time, ["Month", "Theme"]),
+            sorted_frame(baseline_developer.get_theme_distribution_over_time(expected), ["Month", "Theme"]),
+        )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_reach_matches_post_level(indexed_docs, seed):
+    # Large follower counts, where float sums drift the most
+    rnd = random.Random(seed)
+    for account in indexed_docs:
+        account["followers"] = rnd.randrange(0, 50_000_000)
+    cube = cube_dataset(indexed_docs, index_dataset(indexed_docs, developer_data.THEME_KEYWORDS))
+
+    for spec in cube_specs(indexed_docs, n_specs=30, seed=seed):
+        filtered = developer_data.filter_data(indexed_docs, **spec)
+        rollup = cube.rollup(spec.get("selected_themes"), spec.get("selected_accounts"), spec.get("date_range"), spec.get("selected_countries"))
+        assert rollup.estimated_reach == developer_data.get_estimated_reach(filtered) == exact_reach(filtered)
+
+
+def test_snapshot_with_cube_matches_without(indexed_docs):
+    cube = get_cube(indexed_docs)
+    for spec in cube_specs(indexed_docs, n_specs=10, seed=10):
+        filter_spec = make_filter_spec(**spec)
+        filtered = developer_data.filter_data(indexed_docs, **spec)
+        with_cube = DashboardSnapshot(filtered, cube=cube, spec=filter_spec)
+        without_cube = DashboardSnapshot(filtered)
+        for name in ["total_accounts", "total_countries", "total_posts", "total_engagements", "estimated_reach", "avg_engagement"]:
+            assert getattr(with_cube, name) == getattr(without_cube, name), name
+        for name in ["post_trend", "engagement_trend"]:
+            pd.testing.assert_frame_equal(getattr(with_cube, name), getattr(without_cube, name), check_dtype=False)
+        assert_same_frame(
+            sorted_frame(with_cube.theme_distribution_over_time, ["Month", "Theme"]),
+            sorted_frame(without_cube.theme_distribution_over_time, ["Month", "Theme"]),
+        )
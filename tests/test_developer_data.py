@@ -0,0 +1,147 @@
+import copy
+import threading
+
+import pytest
+
+import developer_data
+
+mongomock = pytest.importorskip("mongomock")
+
+
+class FakeClock:
+    """Stands in for the time module of developer_data, moved forward by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(developer_data, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def client(developer_docs):
+    client = mongomock.MongoClient()
+    developer_data.get_collection(client).insert_many(copy.deepcopy(developer_docs))
+    developer_data.clear_data_cache()
+    yield client
+    developer_data.clear_data_cache()
+
+
+def add_account(client):
+    developer_data.get_collection(client).insert_one({"username": "new_developer", "posts": []})
+
+
+def test_one_client_per_process():
+    uri = "mongodb://localhost:1/?serverSelectionTimeoutMS=1"
+    assert developer_data.get_client(uri) is developer_data.get_client(uri)
+
+
+def test_get_data_is_served_from_the_snapshot(client, developer_docs, clock):
+    data = developer_data.get_data(client)
+    assert [account["username"] for account in data] == [account["username"] for account in developer_docs]
+    assert developer_data.get_data(client) is data
+    assert developer_data.get_data(client) is data
+
+    stats = developer_data.get_data_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["accounts"]) == (2, 1, len(developer_docs))
+
+
+def test_snapshot_expires_after_its_ttl(client, clock):
+    data = developer_data.get_data(client, ttl=60)
+    version = developer_data.get_data_version()
+    add_account(client)
+
+    clock.now += 60
+    assert developer_data.get_data(client, ttl=60) is data
+    assert developer_data.get_data_cache_stats()["age_seconds"] == 60
+
+    clock.now += 1
+    reloaded = developer_data.get_data(client, ttl=60)
+    assert reloaded is not data
+    assert reloaded[-1]["username"] == "new_developer"
+    assert developer_data.get_data_version() == version + 1
+
+    stats = developer_data.get_data_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_refresh_data_reloads_within_the_ttl(client, clock):
+    data = developer_data.get_data(client)
+    add_account(client)
+    assert developer_data.get_data(client) is data
+
+    refreshed = developer_data.refresh_data(client)
+    assert refreshed is not data
+    assert refreshed[-1]["username"] == "new_developer"
+    assert developer_data.get_data(client) is refreshed
+
+
+def test_sessions_keep_the_snapshot_while_the_next_one_loads(client, clock, monkeypatch):
+    data, version = developer_data.get_versioned_data(client, ttl=60)
+    clock.now += 61
+
+    load_data = developer_data._load_data
+    loading = threading.Event()
+    release = threading.Event()
+
+    def slow_load(client):
+        loading.set()
+        release.wait(10)
+        return load_data(client)
+
+    monkeypatch.setattr(developer_data, "_load_data", slow_load)
+    results = []
+    loader = threading.Thread(target=lambda: results.append(developer_data.get_versioned_data(client, ttl=60)))
+    loader.start()
+    assert loading.wait(10)
+
+    # Not blocked by the load in progress
+    assert developer_data.get_versioned_data(client, ttl=60) == (data, version)
+
+    release.set()
+    loader.join(10)
+    reloaded, reloaded_version = results[0]
+    assert reloaded is not data
+    assert reloaded_version == version + 1
+    assert developer_data.get_versioned_data(client, ttl=60) == (reloaded, reloaded_version)
+
+
+def test_failed_reload_is_retried_after_a_backoff(client, clock, monkeypatch):
+    data = developer_data.get_data(client, ttl=60)
+    load_data = developer_data._load_data
+    attempts = []
+
+    def failing_load(client):
+        attempts.append(clock.now)
+        raise ConnectionError("MongoDB is down")
+
+    monkeypatch.setattr(developer_data, "_load_data", failing_load)
+    clock.now += 61
+    # The previous snapshot is served, the reruns after the failure don't try again
+    for _ in range(3):
+        assert developer_data.get_data(client, ttl=60) is data
+    assert len(attempts) == 1
+
+    clock.now += developer_data.DATA_RETRY_SECONDS + 1
+    assert developer_data.get_data(client, ttl=60) is data
+    assert len(attempts) == 2
+
+    monkeypatch.setattr(developer_data, "_load_data", load_data)
+    clock.now += developer_data.DATA_RETRY_SECONDS + 1
+    assert developer_data.get_data(client, ttl=60) is not data
+
+
+def test_first_load_failure_raises(client, monkeypatch):
+    def failing_load(client):
+        raise ConnectionError("MongoDB is down")
+
+    monkeypatch.setattr(developer_data, "_load_data", failing_load)
+    with pytest.raises(ConnectionError):
+        developer_data.get_data(client)
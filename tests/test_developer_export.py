@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+import pytest
+
+import baseline_developer
+import developer_data
+from developer_export import EXPORT_COLUMNS, export_posts
+
+
+def read_export(path, export_format):
+    if export_format == "Parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path, keep_default_na=False, na_values=[""])
+
+
+@pytest.mark.parametrize("export_format", ["CSV", "Parquet"])
+@pytest.mark.parametrize("chunk_rows", [7, 20_000])
+def test_export_totals_match_baseline(indexed_docs, tmp_path, export_format, chunk_rows):
+    if export_format == "Parquet":
+        pytest.importorskip("pyarrow")
+
+    spec = {"selected_themes": ["Sustainability", "Smart Home Technology", "Others"]}
+    filtered = developer_data.filter_data(indexed_docs, **spec)
+    expected = baseline_developer.filter_data(indexed_docs, **spec)
+
+    path = export_posts(filtered, export_format, directory=str(tmp_path), chunk_rows=chunk_rows)
+    assert os.path.dirname(path) == str(tmp_path)
+    df = read_export(path, export_format)
+
+    assert list(df.columns) == EXPORT_COLUMNS
+    assert len(df) == baseline_developer.get_total_posts(expected)
+    assert int(df["engagement"].sum()) == baseline_developer.get_total_engagements(expected)
+    assert df["url"].tolist() == [post["url"] for account in expected for post in account["posts"]]
+    assert df["username"].tolist() == [account["username"] for account in expected for _ in account["posts"]]
+
+    # Same months as the post trend
+    months = pd.to_datetime(df["upload_date"]).dropna().dt.to_period("M").dt.to_timestamp()
+    post_trend = baseline_developer.get_post_trend_data(expected)
+    assert months.value_counts().sort_index().tolist() == post_trend["post_count"].tolist()
+
+
+def test_empty_export_has_header(tmp_path):
+    path = export_posts([], "CSV", directory=str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == ",".join(EXPORT_COLUMNS) + "\n"
@@ -0,0 +1,14 @@
+import baseline_developer
+import developer_data
+from parity import assert_same_posts, filter_specs
+
+
+def test_filter_data_matches_baseline(indexed_docs):
+    for spec in filter_specs(indexed_docs):
+        assert_same_posts(developer_data.filter_data(indexed_docs, **spec), baseline_developer.filter_data(indexed_docs, **spec))
+
+
+def test_filter_data_without_index(developer_docs):
+    # A list that was never loaded through get_data is indexed on the fly
+    for spec in filter_specs(developer_docs, n_specs=5, seed=1):
+        assert_same_posts(developer_data.filter_data(developer_docs, **spec), baseline_developer.filter_data(developer_docs, **spec))
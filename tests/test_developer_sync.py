@@ -0,0 +1,103 @@
+import copy
+import json
+import os
+from collections import Counter
+
+import pytest
+
+import developer_data
+from developer_sync import STATE_FILE, sync_snapshot
+
+mongomock = pytest.importorskip("mongomock")
+
+
+def post_keys(data):
+    return Counter((account["username"], post["url"]) for account in data for post in account.get("posts", []))
+
+
+def read_state(snapshot_dir):
+    with open(os.path.join(snapshot_dir, STATE_FILE)) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def collection(developer_docs):
+    collection = developer_data.get_collection(mongomock.MongoClient())
+    collection.insert_many(copy.deepcopy(developer_docs))
+    return collection
+
+
+def test_incremental_sync_picks_up_every_new_post(collection, developer_docs, tmp_path):
+    snapshot_dir = str(tmp_path)
+    data = sync_snapshot(collection, snapshot_dir)
+    assert post_keys(data) == post_keys(developer_docs)
+    watermark = read_state(snapshot_dir)["watermark"]
+
+    # Posts added upstream since the first sync, whatever their upload_date
+    new_posts = [
+        {"url": "https://x/after", "upload_date": "2099-01-01", "caption": "dated after the watermark"},
+        {"url": "https://x/same-day", "upload_date": watermark, "caption": "dated on the watermark day"},
+        {"url": "https://x/none", "upload_date": None},
+        {"url": "https://x/missing"},
+        {"url": "https://x/malformed", "upload_date": "not a date"},
+        {"url": "https://x/not-padded", "upload_date": "2020-1-5"},
+        {"url": "https://x/number", "upload_date": 20200105},
+    ]
+    collection.update_one({"username": "developer_0"}, {"$push": {"posts": {"$each": new_posts}}})
+    collection.insert_one({"username": "new_developer", "country": "Egypt", "posts": [{"url": "https://x/new-account"}]})
+    expected = post_keys(developer_docs) + Counter(("developer_0", post["url"]) for post in new_posts)
+    expected[("new_developer", "https://x/new-account")] += 1
+
+    data = sync_snapshot(collection, snapshot_dir)
+    assert post_keys(data) == expected
+    assert read_state(snapshot_dir)["watermark"] == "2099-01-01"
+
+    # Nothing changed upstream, the posts without a date are downloaded again but not duplicated
+    data = sync_snapshot(collection, snapshot_dir)
+    assert post_keys(data) == expected
+    assert read_state(snapshot_dir)["delta_posts"] == 0
+
+    # Only the snapshot files are left, no temporary files
+    assert sorted(os.listdir(snapshot_dir)) == ["accounts.parquet", "posts.parquet", "state.json"]
+
+
+def test_refetched_posts_replace_their_snapshot_row(collection, tmp_path):
+    snapshot_dir = str(tmp_path)
+    posts = [
+        {"url": "https://x/recent", "upload_date": "2099-01-01", "number_of_likes": 1, "video_view_count": 10},
+        {"url": "https://x/undated", "number_of_likes": 2},
+    ]
+    collection.insert_one({"username": "engagement", "posts": posts})
+    sync_snapshot(collection, snapshot_dir)
+
+    # Both posts come back in the next delta, with new engagement counts
+    collection.update_one({"username": "engagement"}, {"$set": {
+        "posts.0.number_of_likes": 100, "posts.0.number_of_comments": 5, "posts.0.video_view_count": 1000, "posts.1.number_of_likes": 200,
+    }})
+    data = sync_snapshot(collection, snapshot_dir)
+
+    account = next(account for account in data if account["username"] == "engagement")
+    assert account["posts"] == [
+        {"url": "https://x/recent", "upload_date": "2099-01-01", "hashtags": [], "number_of_likes": 100, "number_of_comments": 5, "video_view_count": 1000},
+        {"url": "https://x/undated", "hashtags": [], "number_of_likes": 200},
+    ]
+    state = read_state(snapshot_dir)
+    assert state["delta_posts"] == 0
+    assert state["updated_posts"] >= 2
+
+
+def test_deleted_accounts_are_dropped(collection, developer_docs, tmp_path):
+    snapshot_dir = str(tmp_path)
+    sync_snapshot(collection, snapshot_dir)
+    collection.delete_one({"username": "developer_1"})
+
+    data = sync_snapshot(collection, snapshot_dir)
+    assert "developer_1" not in {account["username"] for account in data}
+    assert post_keys(data) == post_keys([account for account in developer_docs if account["username"] != "developer_1"])
+
+
+def test_full_sync_matches_incremental(collection, tmp_path):
+    incremental = sync_snapshot(collection, str(tmp_path / "incremental"))
+    incremental = sync_snapshot(collection, str(tmp_path / "incremental"))
+    full = sync_snapshot(collection, str(tmp_path / "full"), full=True)
+    assert post_keys(incremental) == post_keys(full)
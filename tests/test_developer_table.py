@@ -0,0 +1,37 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+import baseline_developer
+import developer_data
+from developer_table import TABLE_COLUMNS, AccountsTable
+
+
+def expected_page(accounts, page, page_size, search=None, sort_by=None, ascending=True):
+    """The page of the get_accounts table searched, sorted and sliced with pandas"""
+    if search:
+        text = accounts[["User Name", "Full Name", "Countries", "External URL", "Post URL"]].astype(str).apply(lambda column: column.str.lower())
+        accounts = accounts[text.apply(lambda column: column.str.contains(search.lower(), regex=False)).any(axis=1)]
+    if sort_by:
+        accounts = accounts.sort_values(sort_by, ascending=ascending, kind="stable")
+    start = (page - 1) * page_size
+    return accounts.iloc[start:start + page_size], len(accounts)
+
+
+@pytest.mark.parametrize("search", [None, "", "DEVELOPER_1", "sodic", "example.com", "no such account"])
+def test_pages_match_get_accounts(indexed_docs, search):
+    filtered = developer_data.filter_data(indexed_docs, selected_themes=["Sustainability", "Others"])
+    accounts = baseline_developer.get_accounts(filtered)[TABLE_COLUMNS]
+    table = AccountsTable(developer_data.build_post_frame(filtered))
+
+    assert len(table) == len(accounts)
+    assert table.count(search) == expected_page(accounts, 1, 1, search)[1]
+    sorts = [(None, True)] + [(sort_by, ascending) for sort_by in TABLE_COLUMNS for ascending in (True, False)]
+    for (sort_by, ascending), page, page_size in itertools.product(sorts, (1, 2, 5), (25, 50)):
+        df, total = table.page(page, page_size, search, sort_by, ascending)
+        expected, expected_total = expected_page(accounts, page, page_size, search, sort_by, ascending)
+        assert total == expected_total
+        # Rows are numbered from their position in the whole result
+        assert list(df.index) == list(range((page - 1) * page_size + 1, (page - 1) * page_size + len(expected) + 1))
+        pd.testing.assert_frame_equal(df.reset_index(drop=True).astype(object), expected.reset_index(drop=True).astype(object))
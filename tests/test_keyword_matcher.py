@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+import pytest
+from rapidfuzz import fuzz
+
+import baseline_developer
+import developer_data
+from developer_data import THEME_KEYWORDS
+from keyword_matcher import get_theme_matcher
+from parity import filter_specs
+
+
+@pytest.mark.parametrize("allow_multiple_themes", [True, False])
+@pytest.mark.parametrize("fuzzy_threshold", [-1, 60, 80, 100, 101])
+def test_theme_distribution_matches_baseline(indexed_docs, allow_multiple_themes, fuzzy_threshold):
+    for spec in filter_specs(indexed_docs, n_specs=3, seed=4):
+        filtered = developer_data.filter_data(indexed_docs, **spec)
+        expected = baseline_developer.filter_data(indexed_docs, **spec)
+        assert developer_data.get_theme_distribution(filtered, allow_multiple_themes, fuzzy_threshold) == \
+            baseline_developer.get_theme_distribution(expected, allow_multiple_themes, fuzzy_threshold)
+
+
+def test_fuzzy_phase_scores_every_keyword():
+    # "jetted bathtub" comes after the first 10 keywords of its theme, which were
+    # the only ones the fuzzy phase scored before it was batched
+    keywords = THEME_KEYWORDS["Wellness Amenities"]
+    assert keywords.index("jetted bathtub") >= 10
+    caption = "soak in the jetted athtub tonight"
+    assert all(fuzz.partial_ratio(keyword.lower(), caption) < 90 for keyword in keywords[:10])
+
+    for allow_multiple_themes in (True, False):
+        assert developer_data.get_theme_distribution([{"posts": [{"caption": caption}]}], allow_multiple_themes, 90) == {"Wellness Amenities": 1}
+
+
+@pytest.mark.parametrize("threshold", [60, 80, 95])
+def test_fuzzy_match_masks_match_every_keyword_score(threshold):
+    matcher = get_theme_matcher(THEME_KEYWORDS)
+    rnd = random.Random(threshold)
+    words = [keyword.lower() for keywords in THEME_KEYWORDS.values() for keyword in keywords] + ["the", "new", "villa", "launch"]
+    # Repeated blobs are scored once
+    blobs = [" ".join(rnd.sample(words, 3))[rnd.randrange(4):] for _ in range(150)] * 2
+
+    expected = np.array([
+        sum(
+            1 << theme_index
+            for theme_index, keywords in enumerate(THEME_KEYWORDS.values())
+            if any(len(keyword) >= 4 and fuzz.partial_ratio(keyword.lower(), blob) >= threshold for keyword in keywords)
+        )
+        for blob in blobs
+    ], dtype=np.int64)
+    assert (matcher.fuzzy_match_masks(blobs, threshold, workers=1, chunk_size=7, keyword_batch=3) == expected).all()
+    # The first matching theme is the lowest bit
+    first = matcher.fuzzy_match_masks(blobs, threshold, workers=1, first_only=True)
+    assert (first == expected & -expected).all()
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+import developer_index
+import language_detection
+from developer_data import THEME_KEYWORDS
+from developer_index import PostIndex
+from language_detection import UNDETERMINED, LanguageCache, detect_language, detect_languages, script_language
+from language_keywords import normalize_arabic
+from theme_classifier import classify_text_blobs
+
+ARABIC = "شقق فاخرة مع مسبح وإطلالة بحرية في دبي"
+PERSIAN = "آپارتمان لوکس با استخر و چشم انداز دریا در تهران"
+URDU = "کراچی میں سمندر کے نظارے کے ساتھ شاندار اپارٹمنٹس"
+ENGLISH = "Luxury villas with a private pool"
+
+
+@pytest.fixture
+def detections(monkeypatch):
+    """Captions passed to langdetect, one list per batch, with the workers they were given"""
+    batches = []
+    detect_captions = language_detection._detect_captions
+
+    def recording(captions, workers, chunk_size, min_parallel):
+        batches.append((list(captions), workers))
+        return detect_captions(captions, workers, chunk_size, min_parallel)
+
+    monkeypatch.setattr(language_detection, "_detect_captions", recording)
+    return batches
+
+
+def account(*captions):
+    return {"username": "developer", "posts": [{"caption": caption, "hashtags": [], "url": str(n)} for n, caption in enumerate(captions)]}
+
+
+@pytest.mark.parametrize("caption, script, language", [
+    (ARABIC, "ar", "ar"),
+    (PERSIAN, None, "fa"),
+    (URDU, None, "ur"),
+    (ENGLISH, UNDETERMINED, UNDETERMINED),
+    ("", UNDETERMINED, UNDETERMINED),
+    # Hashtag signs are dropped, links and mentions are not text of the caption
+    (f"{ENGLISH} #دبي https://example.com", "ar", "ar"),
+    (f"@مطور {ENGLISH} https://example.com/دبي", UNDETERMINED, UNDETERMINED),
+])
+def test_detect_language(caption, script, language):
+    assert script_language(caption) == script
+    assert detect_language(caption) == language
+
+
+def test_normalize_arabic():
+    assert normalize_arabic("أإآٱ") == "اااا"
+    assert normalize_arabic("مبنى") == "مبني"
+    assert normalize_arabic("طاقة شمسية") == "طاقه شمسيه"
+    assert normalize_arabic("مؤشر شاطئ") == "موشر شاطي"
+    # Diacritics and tatweel
+    assert normalize_arabic("مَسْبَحٌ") == "مسبح"
+    assert normalize_arabic("مـسـبح") == "مسبح"
+    assert normalize_arabic("pool") == "pool"
+
+
+def test_arabic_posts_match_arabic_terms():
+    captions = ["فيلا مع جاكوزى", "إطلالَة على البحر", "مشروع جديد", PERSIAN, ENGLISH]
+    index = PostIndex([account(*captions)], THEME_KEYWORDS)
+    names = [[name for bit, name in enumerate(index.theme_names) if mask >> bit & 1] for mask in index.theme_masks]
+
+    assert list(index.languages) == ["ar", "ar", "ar", "fa", UNDETERMINED]
+    assert names[0] == ["Wellness Amenities"]
+    assert names[1] == ["Views"]
+    # Arabic without any known term, and languages without a dictionary of their own
+    assert names[2] == ["Others"]
+    assert names[3] == ["Others"]
+
+
+def test_english_masks_are_unchanged(developer_docs):
+    index = PostIndex(developer_docs, THEME_KEYWORDS)
+    masks, _, _, _ = classify_text_blobs(index.text_blobs, THEME_KEYWORDS)
+    masks[masks == 0] = index.others_bit
+
+    english = index.languages == UNDETERMINED
+    assert english.any()
+    np.testing.assert_array_equal(index.theme_masks[english], masks[english])
+
+
+def test_cache_is_shared_through_sqlite(tmp_path, detections):
+    path = str(tmp_path / "languages.sqlite")
+    captions = [PERSIAN, URDU, ARABIC, PERSIAN]
+    assert detect_languages(captions, cache=LanguageCache(path), workers=1) == ["fa", "ur", "ar", "fa"]
+    # Each distinct caption is detected once, the Arabic one is told by its script
+    assert detections == [([PERSIAN, URDU], 1)]
+
+    # A new process starts with an empty memory cache
+    assert detect_languages(captions, cache=LanguageCache(path), workers=1) == ["fa", "ur", "ar", "fa"]
+    assert len(detections) == 1
+
+
+def test_other_detector_versions_are_detected_again(tmp_path, detections, monkeypatch):
+    path = str(tmp_path / "languages.sqlite")
+    detect_languages([PERSIAN], cache=LanguageCache(path), workers=1)
+    monkeypatch.setattr(language_detection, "DETECTOR_VERSION", "next")
+    assert detect_languages([PERSIAN], cache=LanguageCache(path), workers=1) == ["fa"]
+    assert len(detections) == 2
+
+
+def test_guesses_without_langdetect_are_not_stored(tmp_path, detections, monkeypatch):
+    path = str(tmp_path / "languages.sqlite")
+    detector_factory = language_detection._detector_factory
+    monkeypatch.setattr(language_detection, "_detector_factory", lambda: None)
+    cache = LanguageCache(path)
+    assert detect_languages([PERSIAN, URDU], cache=cache, workers=1) == ["ar", "ar"]
+    # Remembered by this cache, not by the file
+    detect_languages([PERSIAN, URDU], cache=cache, workers=1)
+    assert len(detections) == 1
+    assert LanguageCache(path).get_many([language_detection.caption_hash(PERSIAN)]) == {}
+
+    monkeypatch.setattr(language_detection, "_detector_factory", detector_factory)
+    assert detect_languages([PERSIAN, URDU], cache=LanguageCache(path), workers=1) == ["fa", "ur"]
+    assert len(detections) == 2
+
+
+def test_throwaway_index_reuses_the_cache(tmp_path, detections, monkeypatch):
+    monkeypatch.setattr(language_detection, "_language_cache", LanguageCache(str(tmp_path / "languages.sqlite")))
+    data = [account(PERSIAN, URDU, ARABIC, ENGLISH)]
+
+    index, _ = developer_index.get_post_index(data, THEME_KEYWORDS)
+    assert list(index.languages) == ["fa", "ur", "ar", UNDETERMINED]
+    # In process, no pool is started for a throwaway index
+    assert detections == [([PERSIAN, URDU], 1)]
+
+    index, _ = developer_index.get_post_index([account(PERSIAN, URDU, ARABIC, ENGLISH)], THEME_KEYWORDS)
+    assert list(index.languages) == ["fa", "ur", "ar", UNDETERMINED]
+    assert len(detections) == 1
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+import perf_metrics
+
+
+@pytest.fixture
+def metrics_on(monkeypatch):
+    monkeypatch.setattr(perf_metrics, "PERF_METRICS", True)
+    monkeypatch.setattr(perf_metrics, "PERF_METRICS_EXPORT", "")
+    perf_metrics.reset_metrics()
+    yield
+    perf_metrics.end_run()
+    perf_metrics.reset_metrics()
+
+
+def filtered(data):
+    return [value for value in data if value]
+
+
+def recorded_run():
+    """One run of a section calling a timed function that hits and misses a cache"""
+    function = perf_metrics.timed("test.filtered")(filtered)
+    perf_metrics.begin_run("test_run")
+    with perf_metrics.section("test/section", rows_in=3) as timer:
+        function([1, 0, 2])
+        perf_metrics.note_cache(True)
+        perf_metrics.note_cache(False)
+        timer.rows_out = 2
+    return perf_metrics.end_run()
+
+
+def test_metrics_off_wraps_nothing(monkeypatch, capsys):
+    monkeypatch.setattr(perf_metrics, "PERF_METRICS", False)
+    assert perf_metrics.timed("test.filtered")(filtered) is filtered
+    assert perf_metrics.section("test/section") is perf_metrics._NULL_TIMER
+    assert perf_metrics.section("other/section", rows_in=3) is perf_metrics._NULL_TIMER
+
+    namespace = {"filtered": filtered}
+    perf_metrics.instrument(namespace, __name__)
+    assert namespace["filtered"] is filtered
+
+    with perf_metrics.section("test/section") as timer:
+        timer.rows_out = 2
+    perf_metrics.begin_run("test_run")
+    assert perf_metrics.end_run() is None
+    perf_metrics.log("Built something")
+    assert capsys.readouterr().out == ""
+
+
+def test_run_records_timers(metrics_on):
+    run = recorded_run()
+    assert run["name"] == "test_run"
+
+    section = run["timers"]["test/section"]
+    assert (section["kind"], section["calls"], section["rows_in"], section["rows_out"]) == ("section", 1, 3, 2)
+    assert (section["cache_hits"], section["cache_misses"]) == (1, 1)
+    # The timed function is nested in the section
+    function = run["timers"]["test.filtered"]
+    assert (function["kind"], function["calls"], function["rows_in"], function["rows_out"]) == ("function", 1, 3, 2)
+    assert section["self_seconds"] == pytest.approx(section["seconds"] - function["seconds"])
+
+    metrics = perf_metrics.get_metrics()
+    assert metrics["runs"]["test_run"]["runs"] == 1
+    assert metrics["timers"]["test/section"]["calls"] == 1
+
+
+def test_json_lines(metrics_on, tmp_path, monkeypatch):
+    path = tmp_path / "metrics-{pid}.jsonl"
+    monkeypatch.setattr(perf_metrics, "PERF_METRICS_EXPORT", str(path))
+    recorded_run()
+    recorded_run()
+
+    exported = tmp_path / perf_metrics._export_path(path.name)
+    lines = [json.loads(line) for line in exported.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 2
+    assert {line["run"] for line in lines} == {"test_run"}
+    assert lines[0]["timers"]["test/section"]["rows_out"] == 2
+    assert lines[0]["timers"]["test.filtered"]["calls"] == 1
+
+
+def test_prometheus(metrics_on, tmp_path):
+    pytest.importorskip("prometheus_client")
+    from prometheus_client.parser import text_string_to_metric_families
+
+    recorded_run()
+    recorded_run()
+    path = tmp_path / "metrics.prom"
+    perf_metrics.write_prometheus(str(path))
+
+    samples = {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(path.read_text())
+        for sample in family.samples
+    }
+    assert samples[("dashboard_calls_total", (("kind", "section"), ("name", "test/section")))] == 2
+    assert samples[("dashboard_rows_in_total", (("kind", "function"), ("name", "test.filtered")))] == 6
+    assert samples[("dashboard_cache_hits_total", (("kind", "section"), ("name", "test/section")))] == 2
+    assert samples[("dashboard_runs_total", (("run", "test_run"),))] == 2
@@ -0,0 +1,40 @@
+import baseline_developer
+import developer_data
+from parity import assert_same_frame, exact_reach, filter_specs, sorted_frame
+
+
+def test_kpis_match_baseline(indexed_docs):
+    for spec in filter_specs(indexed_docs, seed=2):
+        filtered = developer_data.filter_data(indexed_docs, **spec)
+        expected = baseline_developer.filter_data(indexed_docs, **spec)
+        posts = developer_data.build_post_frame(filtered)
+
+        for data in (filtered, posts):
+            assert developer_data.get_total_posts(data) == baseline_developer.get_total_posts(expected)
+            assert developer_data.get_total_engagements(data) == baseline_developer.get_total_engagements(expected)
+            assert developer_data.get_estimated_reach(data) == exact_reach(expected)
+        assert abs(baseline_developer.get_estimated_reach(expected) - exact_reach(expected)) <= 1
+        assert developer_data.get_total_countries(filtered) == baseline_developer.get_total_countries(expected)
+
+
+def test_trends_match_baseline(indexed_docs):
+    for spec in filter_specs(indexed_docs, n_specs=10, seed=3):
+        filtered = developer_data.filter_data(indexed_docs, **spec)
+        expected = baseline_developer.filter_data(indexed_docs, **spec)
+
+        assert_same_frame(developer_data.get_post_trend_data(filtered), baseline_developer.get_post_trend_data(expected))
+        assert_same_frame(developer_data.get_engagement_trend_data(filtered), baseline_developer.get_engagement_trend_data(expected))
+
+        columns = ["Month", "Theme"]
+        assert_same_frame(
+            sorted_frame(developer_data.get_theme_distribution_over_time(filtered), columns),
+            sorted_frame(baseline_developer.get_theme_distribution_over_time(expected), columns),
+        )
+
+
+def test_accounts_match_baseline(indexed_docs):
+    for spec in filter_specs(indexed_docs, n_specs=5, seed=6):
+        filtered = developer_data.filter_data(indexed_docs, **spec)
+        expected = baseline_developer.filter_data(indexed_docs, **spec)
+        actual = developer_data.get_accounts(filtered)
+        assert_same_frame(actual.astype(object), baseline_developer.get_accounts(expected).reindex(columns=actual.columns).astype(object))
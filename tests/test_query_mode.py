@@ -0,0 +1,66 @@
+import copy
+import os
+import uuid
+from datetime import date
+
+import pytest
+
+import baseline_developer
+import developer_data
+from parity import assert_same_posts, filter_specs
+
+# mongomock has no $reduce and $indexOfCP, the keyword filter of the pipeline only
+# runs against a real server. Point this at a scratch mongod to include it.
+TEST_MONGO_URI = os.environ.get("DEVELOPER_TEST_MONGO_URI", "")
+
+
+@pytest.fixture
+def mongomock_client(developer_docs):
+    mongomock = pytest.importorskip("mongomock")
+    client = mongomock.MongoClient()
+    developer_data.get_collection(client).insert_many(copy.deepcopy(developer_docs))
+    return client
+
+
+@pytest.fixture
+def mongod_client(developer_docs):
+    if not TEST_MONGO_URI:
+        pytest.skip("DEVELOPER_TEST_MONGO_URI is not set")
+    from pymongo import MongoClient
+
+    client = MongoClient(TEST_MONGO_URI)
+    # A database of its own, dropped afterwards
+    database = f"developer-test-{uuid.uuid4().hex}"
+    client[database][developer_data.COLLECTION_NAME].insert_many(copy.deepcopy(developer_docs))
+    original_name = developer_data.DB_NAME
+    developer_data.DB_NAME = database
+    yield client
+    developer_data.DB_NAME = original_name
+    client.drop_database(database)
+    client.close()
+
+
+def test_query_mode_matches_filter_data(developer_docs, mongomock_client):
+    for spec in filter_specs(developer_docs, n_specs=40, seed=7)[1:]:
+        spec.pop("selected_keywords", None)
+        if not spec:
+            continue
+        actual = developer_data.query_filtered_data(client=mongomock_client, **spec)
+        assert_same_posts(actual, baseline_developer.filter_data(developer_docs, **spec))
+
+
+def test_query_mode_dates_match_strptime():
+    mongomock = pytest.importorskip("mongomock")
+    client = mongomock.MongoClient()
+    # Not zero padded dates are in range, impossible ones are not
+    dates = ["2023-1-5", "2023-01-05", "2023-12-31", "2024-1-1", "2023-02-30", "2023-1-5 ", "23-01-05", None, 20230105]
+    developer_data.get_collection(client).insert_one({"username": "dates", "posts": [{"upload_date": value, "url": str(value)} for value in dates]})
+
+    data = developer_data.query_filtered_data(date_range=(date(2023, 1, 1), date(2023, 12, 31)), client=client)
+    assert [post["url"] for post in data[0]["posts"]] == ["2023-1-5", "2023-01-05", "2023-12-31"]
+
+
+def test_query_mode_keywords_match_filter_data(developer_docs, mongod_client):
+    for spec in filter_specs(developer_docs, n_specs=40, seed=8)[1:]:
+        actual = developer_data.query_filtered_data(client=mongod_client, **spec)
+        assert_same_posts(actual, baseline_developer.filter_data(developer_docs, **spec))
@@ -0,0 +1,63 @@
+import importlib
+import sys
+
+import pytest
+
+import startup_profiler
+from startup_profiler import ImportProfiler, _TimedLoader, format_report, import_timings
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    """Two modules on the path, the outer one importing the inner one, both sleeping a little"""
+    (tmp_path / "profiled_inner.py").write_text("import time\ntime.sleep(0.05)\n")
+    (tmp_path / "profiled_outer.py").write_text("import time\nimport profiled_inner\ntime.sleep(0.02)\n")
+    (tmp_path / "profiled_later.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    for name in ["profiled_inner", "profiled_outer", "profiled_later"]:
+        sys.modules.pop(name, None)
+
+
+def test_records_import_times(modules):
+    profiler = ImportProfiler()
+    profiler.install()
+    try:
+        assert sys.meta_path[0] is profiler
+        module = importlib.import_module("profiled_outer")
+    finally:
+        profiler.uninstall()
+
+    assert profiler.order == ["profiled_outer", "profiled_inner"]
+    # The outer module's self time leaves out the inner import
+    assert profiler.cumulative["profiled_inner"] >= 0.05
+    assert profiler.cumulative["profiled_outer"] >= profiler.cumulative["profiled_inner"] + 0.02
+    assert 0.02 <= profiler.own["profiled_outer"] < profiler.cumulative["profiled_inner"]
+
+    timings = import_timings(profiler)
+    assert [name for name, _, _ in timings] == ["profiled_outer", "profiled_inner"]
+    assert "profiled_inner" in format_report(profiler)
+
+    # The imported modules keep their own loader
+    for imported in [module, sys.modules["profiled_inner"]]:
+        assert not isinstance(imported.__loader__, _TimedLoader)
+        assert not isinstance(imported.__spec__.loader, _TimedLoader)
+
+
+def test_uninstall_stops_recording(modules):
+    profiler = ImportProfiler()
+    profiler.install()
+    profiler.install()
+    assert sys.meta_path.count(profiler) == 1
+    profiler.uninstall()
+    assert profiler not in sys.meta_path
+
+    importlib.import_module("profiled_later")
+    assert profiler.order == []
+    profiler.uninstall()
+
+
+def test_start_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(startup_profiler, "STARTUP_PROFILE", False)
+    assert startup_profiler.start() is None
+    assert not any(isinstance(finder, ImportProfiler) for finder in sys.meta_path)
@@ -0,0 +1,23 @@
+import numpy as np
+
+import theme_classifier
+from developer_data import THEME_KEYWORDS
+from developer_index import post_text_blob
+from theme_classifier import classify_chunk, classify_text_blobs
+
+
+def test_pool_matches_in_process(developer_docs, monkeypatch):
+    text_blobs = [post_text_blob(post) for account in developer_docs for post in account.get("posts", [])]
+    expected = classify_chunk(text_blobs, THEME_KEYWORDS)
+
+    # Every chunk has to go to the spawned workers, which import their own copy
+    def in_process(*args):
+        raise AssertionError("classified in-process")
+    monkeypatch.setattr(theme_classifier, "classify_chunk", in_process)
+
+    # Chunks small enough that every worker gets several, and a last chunk cut short
+    pooled = classify_text_blobs(text_blobs, THEME_KEYWORDS, workers=2, chunk_size=97, min_parallel=0)
+    assert len(text_blobs) > 4 * 97
+    for actual, wanted in zip(pooled, expected):
+        assert actual.dtype == wanted.dtype
+        np.testing.assert_array_equal(actual, wanted)
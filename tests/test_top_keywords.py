@@ -0,0 +1,53 @@
+import pandas as pd
+
+import baseline_developer
+import developer_data
+from developer_data import THEME_KEYWORDS
+from parity import assert_same_frame, filter_specs
+
+
+def expected_by_group(groups, group_column, top_n):
+    """Baseline get_top_keywords of each (name, accounts) group, without the keywords that don't occur"""
+    frames = []
+    for name, data in groups:
+        top = baseline_developer.get_top_keywords(data, top_n)
+        if len(top):
+            top = top[top["Count"] > 0]
+            frames.append(top.assign(**{group_column: name})[[group_column, "Keyword", "Count"]])
+    return pd.concat(frames) if frames else pd.DataFrame(columns=[group_column, "Keyword", "Count"])
+
+
+def test_top_keywords_match_baseline(indexed_docs):
+    for spec in filter_specs(indexed_docs, n_specs=10, seed=5):
+        filtered = developer_data.filter_data(indexed_docs, **spec)
+        expected = baseline_developer.filter_data(indexed_docs, **spec)
+        for top_n in (5, 15):
+            assert_same_frame(developer_data.get_top_keywords(filtered, top_n), baseline_developer.get_top_keywords(expected, top_n))
+
+
+def test_top_keywords_by_group_match_baseline(indexed_docs):
+    for spec in filter_specs(indexed_docs, n_specs=4, seed=11):
+        filtered = developer_data.filter_data(indexed_docs, **spec)
+        expected = baseline_developer.filter_data(indexed_docs, **spec)
+        top_n = 5
+
+        # A post counts towards every theme it matches, posts without one towards "Others"
+        themes = [
+            (theme, baseline_developer.filter_data(expected, selected_themes=[theme]))
+            for theme in list(THEME_KEYWORDS) + ["Others"]
+        ]
+        themes = [(theme, data) for theme, data in themes if baseline_developer.get_total_posts(data)]
+        assert_same_frame(developer_data.get_top_keywords_by_theme(filtered, top_n), expected_by_group(themes, "Theme", top_n))
+
+        # Posts of accounts without a country are left out
+        countries = sorted({account["country"] for account in expected if account["country"] and account["posts"]})
+        assert_same_frame(
+            developer_data.get_top_keywords_by_country(filtered, top_n),
+            expected_by_group([(country, [account for account in expected if account["country"] == country]) for country in countries], "Country", top_n),
+        )
+
+        usernames = sorted(account["username"] for account in expected if account["posts"])
+        assert_same_frame(
+            developer_data.get_top_keywords_by_account(filtered, top_n),
+            expected_by_group([(username, [account for account in expected if account["username"] == username]) for username in usernames], "User Name", top_n),
+        )
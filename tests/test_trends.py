@@ -0,0 +1,85 @@
+import copy
+
+import pandas as pd
+import pytest
+
+import baseline_trends
+import trends_data
+from trends_data import ALL, TrendsAggregates, TrendsQuery, build_trends_frame
+
+
+def assert_same_view_frame(actual, expected, key):
+    actual = actual.reset_index(drop=True)
+    expected = expected.reset_index(drop=True)
+    # Categoricals in the aggregates, plain strings in the baseline
+    actual[key] = actual[key].astype(object)
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False, rtol=1e-5)
+
+
+def test_views_match_baseline(trend_docs):
+    aggregates = TrendsAggregates(build_trends_frame(trend_docs))
+    df = baseline_trends.trends_frame(trend_docs)
+
+    for selected_theme in [ALL] + aggregates.themes:
+        for selected_country in [ALL] + aggregates.countries + ["Nowhere"]:
+            view = aggregates.view(selected_theme, selected_country)
+            expected = baseline_trends.trends_view(df, selected_theme, selected_country)
+            if expected is None:
+                assert view is None
+                continue
+
+            assert_same_view_frame(view.top_themes, expected["top_themes"], "theme")
+            assert_same_view_frame(view.theme_distribution, expected["theme_distribution"], "theme")
+            assert_same_view_frame(view.theme_trend, expected["theme_trend"], "theme")
+            assert_same_view_frame(view.top_keywords, expected["top_keywords"], "keyword")
+            assert_same_view_frame(view.keyword_trend, expected["keyword_trend"], "keyword")
+
+
+def test_selection_lists_match_baseline(trend_docs):
+    aggregates = TrendsAggregates(build_trends_frame(trend_docs))
+    df = baseline_trends.trends_frame(trend_docs)
+    assert aggregates.themes == sorted(df["theme"].dropna().unique().tolist())
+    assert aggregates.countries == sorted(df["country"].dropna().unique().tolist())
+
+
+@pytest.fixture
+def query_docs(trend_docs):
+    # mongomock copies the whole document for every unwound entry, short timelines keep it quick
+    docs = copy.deepcopy(trend_docs[:3])
+    for doc in docs:
+        doc["timeline"] = [entry for entry in doc["timeline"] if entry["date"] < "2023-02-15"]
+    return docs
+
+
+@pytest.fixture
+def query_client(query_docs, monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    client = mongomock.MongoClient()
+    trends_data.get_collection(client).insert_many(copy.deepcopy(query_docs))
+    monkeypatch.setattr(trends_data, "get_client", lambda uri=trends_data.MONGO_URI: client)
+    # The query results are cached per selection, not per client
+    trends_data._query_trends_options.clear()
+    trends_data._query_trends_selection.clear()
+    yield client
+    trends_data._query_trends_options.clear()
+    trends_data._query_trends_selection.clear()
+
+
+def test_query_mode_matches_aggregates(query_docs, query_client):
+    query = TrendsQuery()
+    aggregates = TrendsAggregates(build_trends_frame(query_docs))
+    assert (query.themes, query.countries, query.empty) == (aggregates.themes, aggregates.countries, aggregates.empty)
+
+    for selected_theme in [ALL] + aggregates.themes:
+        for selected_country in [ALL] + aggregates.countries + ["Nowhere"]:
+            view = query.view(selected_theme, selected_country)
+            expected = aggregates.view(selected_theme, selected_country)
+            if expected is None:
+                assert view is None
+                continue
+
+            for field, key in [("top_themes", "theme"), ("theme_distribution", "theme"), ("theme_trend", "theme"), ("top_keywords", "keyword"), ("keyword_trend", "keyword")]:
+                assert_same_view_frame(getattr(view, field), getattr(expected, field).astype({key: object}), key)
+            assert query.top_growing_keywords(selected_theme, selected_country) == pytest.approx(
+                aggregates.top_growing_keywords(selected_theme, selected_country)
+            )
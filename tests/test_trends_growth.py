@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trends_growth import GROWTH_METRICS, KeywordMatrix, growth_scores, top_k_growing
+
+
+def keyword_matrix(series):
+    """KeywordMatrix of {keyword: {date: value}}"""
+    return KeywordMatrix(pd.Series({
+        (keyword, pd.Timestamp(day)): value for keyword, values in series.items() for day, value in values.items()
+    }))
+
+
+def expected_score(points, metric, window_days, last_day):
+    """One keyword's growth from its (day, value) points, a loop over the points per metric"""
+    points = [(day, value) for day, value in points if not math.isnan(value)]
+    if metric == "percent":
+        points = [(day, value) for day, value in points if day >= last_day - window_days]
+    if not points:
+        return math.nan
+    (first_day, start), (end_day, end) = points[0], points[-1]
+
+    if metric == "change":
+        return end - start
+    if metric == "percent":
+        return (end - start) / start * 100 if start > 0 else math.nan
+    if metric == "cagr":
+        years = (end_day - first_day) / 365.25
+        return ((end / start) ** (1 / years) - 1) * 100 if start > 0 and years > 0 else math.nan
+    if len({day for day, _ in points}) < 2:
+        return math.nan
+    return np.polyfit([day / 7 for day, _ in points], [value for _, value in points], 1)[0]
+
+
+SERIES = {
+    "rising": {"2023-01-01": 10, "2023-02-05": 20, "2023-06-04": 35, "2023-12-31": 60},
+    # Missing weeks in the middle and at both ends
+    "gaps": {"2023-02-05": 40, "2023-03-05": 30, "2023-10-01": 45},
+    "falling": {"2023-01-01": 80, "2023-06-04": 50, "2023-12-31": 20},
+    "zero_start": {"2023-01-01": 0, "2023-06-04": 10, "2023-12-31": 25},
+    "negative_start": {"2023-01-01": -5, "2023-12-31": 25},
+    "all_nan": {"2023-01-01": np.nan, "2023-06-04": np.nan},
+    "single_point": {"2023-06-04": 30},
+    "flat": {"2023-01-01": 50, "2023-12-31": 50},
+}
+
+
+@pytest.mark.parametrize("metric", list(GROWTH_METRICS))
+@pytest.mark.parametrize("window_days", [30, 90, 400])
+def test_growth_scores_match_a_loop_per_keyword(metric, window_days):
+    matrix = keyword_matrix(SERIES)
+    scores = growth_scores(matrix, metric, window_days)
+
+    last_day = matrix.days[-1]
+    for keyword, score in zip(matrix.keywords, scores):
+        points = [(day, value) for day, value in zip(matrix.days, matrix.values[list(matrix.keywords).index(keyword)])]
+        expected = expected_score(points, metric, window_days, last_day)
+        if math.isnan(expected):
+            assert math.isnan(score), (keyword, score)
+        else:
+            assert score == pytest.approx(expected, rel=1e-9, abs=1e-9), keyword
+
+
+def test_undefined_growth_is_nan():
+    matrix = keyword_matrix(SERIES)
+    scores = {metric: dict(zip(matrix.keywords, growth_scores(matrix, metric, 400))) for metric in GROWTH_METRICS}
+
+    for metric in GROWTH_METRICS:
+        assert math.isnan(scores[metric]["all_nan"])
+    for keyword in ["zero_start", "negative_start"]:
+        assert math.isnan(scores["percent"][keyword])
+        assert math.isnan(scores["cagr"][keyword])
+    assert math.isnan(scores["slope"]["single_point"])
+    assert math.isnan(scores["cagr"]["single_point"])
+    assert scores["percent"]["flat"] == 0
+
+
+def test_unknown_metric():
+    with pytest.raises(ValueError):
+        growth_scores(keyword_matrix(SERIES), "median")
+
+
+def test_top_k_growing_ties_keep_the_keyword_order():
+    matrix = keyword_matrix({
+        "d": {"2023-01-01": 10, "2023-12-31": 20},
+        "b": {"2023-01-01": 10, "2023-12-31": 20},
+        "c": {"2023-01-01": 0, "2023-12-31": 30},
+        "a": {"2023-01-01": 10, "2023-12-31": 20},
+        "e": {"2023-01-01": np.nan},
+    })
+    assert top_k_growing(matrix, 3, "change") == [("c", 30.0), ("a", 10.0), ("b", 10.0)]
+    assert top_k_growing(matrix, 10, "change") == [("c", 30.0), ("a", 10.0), ("b", 10.0), ("d", 10.0)]
+    # "c" starts at 0 and has no percent growth, keywords without a score are left out
+    assert [keyword for keyword, _ in top_k_growing(matrix, 10, "percent", 400)] == ["a", "b", "d"]
+
+
+def test_empty_matrix():
+    matrix = KeywordMatrix(pd.Series([], index=pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])]), dtype=float))
+    for metric in GROWTH_METRICS:
+        assert top_k_growing(matrix, 3, metric) == []
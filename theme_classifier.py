@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from keyword_matcher import get_theme_matcher
+
+
+# Below this many posts the pool start-up costs more than it saves
+MIN_PARALLEL_POSTS = int(os.environ.get("CLASSIFY_MIN_PARALLEL_POSTS", 200_000))
+CHUNK_SIZE = int(os.environ.get("CLASSIFY_CHUNK_SIZE", 50_000))
+CLASSIFY_WORKERS = int(os.environ.get("CLASSIFY_WORKERS", os.cpu_count() or 1))
+
+
+def classify_chunk(text_blobs, theme_keywords):
+    """
+    Theme bitmasks and keyword hits of a list of text blobs
+
+    Returns:
+        tuple: (masks, hit_rows, hit_keywords, hit_counts). masks has bit i set for
+        theme i of theme_keywords, 0 when no theme matched. Hit j says that blob
+        hit_rows[j] contains keyword hit_keywords[j] (an id into the theme matcher's
+        automaton keywords) hit_counts[j] times. Hits are ordered by row.
+    """
+    matcher = get_theme_matcher(theme_keywords)
+    keyword_masks = matcher.keyword_masks
+    masks = np.zeros(len(text_blobs), dtype=np.int64)
+    hit_rows = []
+    hit_keywords = []
+    hit_counts = []
+    for position, text_blob in enumerate(text_blobs):
+        mask = 0
+        for keyword_id, count in matcher.automaton.count(text_blob).items():
+            mask |= keyword_masks[keyword_id]
+            hit_rows.append(position)
+            hit_keywords.append(keyword_id)
+            hit_counts.append(count)
+        masks[position] = mask
+    return (
+        masks,
+        np.array(hit_rows, dtype=np.int64),
+        np.array(hit_keywords, dtype=np.int32),
+        np.array(hit_counts, dtype=np.int32),
+    )
+
+
+# Each worker process compiles the automaton once and keeps it for all its chunks
+_worker_theme_keywords = None
+
+
+def _init_worker(theme_keywords):
+    global _worker_theme_keywords
+    _worker_theme_keywords = theme_keywords
+    get_theme_matcher(theme_keywords)
+
+
+def _classify_worker_chunk(text_blobs):
+    return classify_chunk(text_blobs, _worker_theme_keywords)
+
+
+def classify_text_blobs(text_blobs, theme_keywords, workers=CLASSIFY_WORKERS, chunk_size=CHUNK_SIZE, min_parallel=MIN_PARALLEL_POSTS):
+    """
+    Theme bitmasks and keyword hits (see classify_chunk) for a large number of text blobs
+
+    The blobs are split into chunks that are classified on a process pool, the
+    results are put back together in chunk order so the output is the same as
+    classifying everything in-process. Small inputs, or workers <= 1, skip the pool.
+
+    Args:
+        text_blobs (list): Lowercased caption + hashtag blobs
+        theme_keywords (dict): Theme -> keywords
+        workers (int): Worker processes
+        chunk_size (int): Blobs per task
+        min_parallel (int): Inputs smaller than this are classified in-process
+
+    Returns:
+        tuple: (masks, hit_rows, hit_keywords, hit_counts), rows are positions in text_blobs
+    """
+    if workers <= 1 or len(text_blobs) < max(min_parallel, chunk_size):
+        return classify_chunk(text_blobs, theme_keywords)
+
+    chunks = [text_blobs[start:start + chunk_size] for start in range(0, len(text_blobs), chunk_size)]
+    workers = min(workers, len(chunks))
+
+    # Spawned rather than forked, forking the threaded Streamlit server is not safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(theme_keywords,)) as executor:
+        # map() yields in submission order, which keeps the merge deterministic
+        results = list(executor.map(_classify_worker_chunk, chunks))
+
+    # Hit rows are positions within their chunk
+    masks = np.concatenate([result[0] for result in results])
+    hit_rows = np.concatenate([result[1] + chunk_number * chunk_size for chunk_number, result in enumerate(results)])
+    hit_keywords = np.concatenate([result[2] for result in results])
+    hit_counts = np.concatenate([result[3] for result in results])
+    return masks, hit_rows, hit_keywords, hit_counts
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+
+# Selectable growth metrics and their labels
+GROWTH_METRICS = {
+    "change": "Latest - earliest",
+    "slope": "Trend slope (per week)",
+    "percent": "% change over window",
+    "cagr": "Compound annual growth",
+}
+
+# Window of the "percent" metric
+DEFAULT_WINDOW_DAYS = 90
+
+
+class KeywordMatrix:
+    """
+    Keyword x date matrix of a keyword time series, NaN where a keyword has no value on a date
+
+    Args:
+        keyword_time (Series): Values indexed by (keyword, date)
+    """
+
+    def __init__(self, keyword_time):
+        keyword_codes, self.keywords = pd.factorize(keyword_time.index.get_level_values(0), sort=True)
+        date_codes, dates = pd.factorize(keyword_time.index.get_level_values(1), sort=True)
+        self.dates = pd.DatetimeIndex(dates)
+        # Days since the first date, the x axis of the slope and CAGR
+        self.days = ((self.dates - self.dates[0]) / pd.Timedelta(days=1)).to_numpy(dtype=np.float64) if len(dates) else np.zeros(0)
+
+        self.values = np.full((len(self.keywords), len(self.dates)), np.nan)
+        self.values[keyword_codes, date_codes] = keyword_time.to_numpy(dtype=np.float64)
+
+
+def _first_last(values):
+    """Column of the first and last value of every row, and whether the row has any"""
+    valid = ~np.isnan(values)
+    has_values = valid.any(axis=1)
+    first = valid.argmax(axis=1)
+    last = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    return has_values, first, last
+
+
+def growth_scores(matrix, metric="change", window_days=DEFAULT_WINDOW_DAYS):
+    """
+    Growth of every keyword of a KeywordMatrix at once
+
+    Metrics:
+        change: latest minus earliest value
+        slope: least-squares slope of the values, in interest points per week
+        percent: % change from the first to the last value of the last window_days
+        cagr: compound annual growth rate (%) between the earliest and latest value
+
+    Returns:
+        ndarray: One score per keyword, NaN where the metric is undefined (no values,
+        a single point, or a starting value of 0 for percent and cagr)
+    """
+    if metric not in GROWTH_METRICS:
+        raise ValueError(f"Unknown growth metric: {metric}")
+
+    values = matrix.values
+    days = matrix.days
+    if metric == "percent" and len(days):
+        in_window = days >= days[-1] - window_days
+        values = values[:, in_window]
+        days = days[in_window]
+
+    scores = np.full(len(values), np.nan)
+    if not values.shape[1]:
+        return scores
+
+    has_values, first, last = _first_last(values)
+    rows = np.arange(len(values))
+    start = values[rows, first]
+    end = values[rows, last]
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if metric == "change":
+            scores = end - start
+        elif metric == "percent":
+            scores = np.where(start > 0, (end - start) / start * 100, np.nan)
+        elif metric == "cagr":
+            years = (days[last] - days[first]) / 365.25
+            scores = np.where((start > 0) & (years > 0), (np.power(end / start, 1 / years) - 1) * 100, np.nan)
+        else:
+            # Closed form least squares over the points each keyword has
+            valid = ~np.isnan(values)
+            weeks = np.where(valid, days / 7, 0.0)
+            y = np.where(valid, values, 0.0)
+            n = valid.sum(axis=1)
+            sum_x = weeks.sum(axis=1)
+            sum_y = y.sum(axis=1)
+            denominator = n * (weeks * weeks).sum(axis=1) - sum_x * sum_x
+            scores = np.where(denominator > 0, (n * (weeks * y).sum(axis=1) - sum_x * sum_y) / denominator, np.nan)
+
+    scores[~has_values] = np.nan
+    return scores
+
+
+def top_k_growing(matrix, k=3, metric="change", window_days=DEFAULT_WINDOW_DAYS):
+    """
+    The k fastest growing keywords of a KeywordMatrix
+
+    Returns:
+        list: (keyword, score) tuples, highest score first. Keywords without a score
+        are left out, ties keep the keyword order.
+    """
+    scores = growth_scores(matrix, metric, window_days)
+    ranked = [keyword_id for keyword_id in np.argsort(-scores, kind="stable") if not np.isnan(scores[keyword_id])]
+    return [(matrix.keywords[keyword_id], float(scores[keyword_id])) for keyword_id in ranked[:k]]